@@ -1,11 +1,14 @@
-from KlebLib import baseconversion, fraction, polynomial, rounding, series, test, tree, universaladdition
+from KlebLib import baseconversion, fraction, fractionarray, polynomial, rounding, series, test, tree, universaladdition
 
 __all__ = [
     'baseconversion.convert_base',
-    'fraction.Fraction',
-    'polynomial.Polynomial',
+    'fraction.Fraction', 'fraction.FrozenFraction', 'fraction.from_float', 'fraction.from_floats',
+    'fraction.Accumulator', 'fraction.sum_fractions', 'fraction.format_mixed', 'fraction.parse_mixed',
+    'fraction.read_fractions', 'fraction.enable_interning', 'fraction.disable_interning', 'fraction.interning_info',
+    'fractionarray.FractionArray',
+    'polynomial.Polynomial', 'polynomial.CompiledPolynomial',
     'rounding.ceiling', 'rounding.smart_round',
-    'series.Series',
+    'series.Series', 'series.CompactSeries', 'series.PersistentSeries', 'series.LazySeries', 'series.NumericSeries', 'series.MappedSeries', 'series.save_series', 'series.load_series',
     'test.Test',
     'tree.Tree',
     'universaladdition.uadd'
@@ -0,0 +1,204 @@
+import argparse
+import json
+import platform
+import random
+from KlebLib import fraction
+from fractions import Fraction as StdFraction
+from statistics import mean, stdev
+from time import perf_counter
+from typing import Callable, Union
+
+__all__ = ['fraction_benchmarks', 'run_benchmarks', 'compare_results']
+
+#The classes that the suite can time, each built from a [num, dem] list
+FRACTION_CLASSES = {
+    'Fraction': fraction.Fraction,
+    'FrozenFraction': fraction.FrozenFraction,
+    'fractions.Fraction': StdFraction
+}
+
+#Get the nth and (n-1)th Fibonacci numbers, which take the most steps of Euclid's algorithm for their size
+def _fibonacci_pair(n:int) -> tuple:
+    a, b = 1, 1
+    for i in range(n - 2):
+        a, b = b, a + b
+
+    return b, a
+
+#Build a fraction of the given class from a numerator and denominator
+def _make(cls, num:int, dem:int):
+    if cls is StdFraction:
+        return StdFraction(num, dem)
+    else:
+        return cls([num, dem])
+
+#Get every benchmark for a fraction class, as a dict of names and functions taking no arguments
+def fraction_benchmarks(cls:type, seed:int=0) -> dict:
+    rng = random.Random(seed)
+    small1 = _make(cls, 355, 113)
+    small2 = _make(cls, -22, 7)
+    large1 = _make(cls, rng.getrandbits(1024) | 1, rng.getrandbits(1024) | 1)
+    large2 = _make(cls, -(rng.getrandbits(1024) | 1), rng.getrandbits(1024) | 1)
+    fibNum, fibDem = _fibonacci_pair(500)
+    unsorted = [_make(cls, rng.randint(-10 ** 6, 10 ** 6), rng.randint(1, 10 ** 6)) for i in range(1000)]
+    huge = _make(cls, 10 ** 12, 3)
+
+    benchmarks = {
+        'construct_list': lambda: _make(cls, 1234, 5678),
+        'construct_str': lambda: cls('1234/5678'),
+        'construct_int': lambda: cls(1234),
+        'construct_float': lambda: cls(0.1234),
+        'construct_large': lambda: _make(cls, fibNum, fibDem),
+        'add': lambda: small1 + small2,
+        'sub': lambda: small1 - small2,
+        'mul': lambda: small1 * small2,
+        'truediv': lambda: small1 / small2,
+        'add_large': lambda: large1 + large2,
+        'mul_large': lambda: large1 * large2,
+        'iadd_isub': _in_place(cls, small1, small2, '+'),
+        'imul_itruediv': _in_place(cls, small1, small2, '*'),
+        'compare_lt': lambda: small1 < small2,
+        'compare_eq': lambda: small1 == small2,
+        'compare_large': lambda: large1 < large2,
+        'sort_1000': lambda: sorted(unsorted),
+        'to_float': lambda: float(small1),
+        'to_str': lambda: str(small1),
+    }
+
+    if cls is not StdFraction:
+        benchmarks['mixed'] = lambda: small1.mixed
+        benchmarks['mixed_large'] = lambda: huge.mixed
+
+    return benchmarks
+
+#Get a function that applies an in-place operator and then its inverse, so that the value stays the same size
+def _in_place(cls, start, other, operator:str) -> Callable:
+    value = _make(cls, start.numerator, start.denominator) if cls is StdFraction else cls(list(start.nums))
+
+    def add():
+        nonlocal value
+        value += other
+        value -= other
+
+    def mul():
+        nonlocal value
+        value *= other
+        value /= other
+
+    return add if operator == '+' else mul
+
+#Find how many loops of a function take at least minTime seconds
+def _calibrate(function:Callable, minTime:float) -> int:
+    loops = 1
+    while True:
+        start = perf_counter()
+        for i in range(loops):
+            function()
+        if perf_counter() - start >= minTime:
+            return loops
+
+        loops *= 2
+
+#Time one function, returning the time per loop of each repeat in seconds
+def _time(function:Callable, repeats:int, minTime:float) -> tuple:
+    loops = _calibrate(function, minTime)
+    values = []
+    for i in range(repeats):
+        start = perf_counter()
+        for j in range(loops):
+            function()
+        values.append((perf_counter() - start) / loops)
+
+    return loops, values
+
+#Run every benchmark for every class, returning JSON-serialisable results
+def run_benchmarks(classes:Union[list, None]=None, names:Union[list, None]=None, repeats:int=5, minTime:float=0.01) -> dict:
+    if classes is None:
+        classes = list(FRACTION_CLASSES)
+
+    benchmarks = []
+    for className in classes:
+        for name, function in fraction_benchmarks(FRACTION_CLASSES[className]).items():
+            if names is not None and name not in names:
+                continue
+
+            loops, values = _time(function, repeats, minTime)
+            benchmarks.append({
+                'name': f'{className}.{name}',
+                'loops': loops,
+                'values': values,
+                'mean': mean(values),
+                'stdev': stdev(values) if len(values) > 1 else 0.0
+            })
+
+    return {
+        'metadata': {
+            'python_implementation': platform.python_implementation(),
+            'python_version': platform.python_version(),
+            'platform': platform.platform(),
+            'repeats': repeats,
+            'min_time': minTime
+        },
+        'benchmarks': benchmarks
+    }
+
+#Compare results with a baseline, returning (name, baseline mean, mean, baseline mean / mean) for every shared benchmark
+def compare_results(results:dict, baseline:dict) -> list:
+    baselineMeans = {benchmark['name']: benchmark['mean'] for benchmark in baseline['benchmarks']}
+
+    output = []
+    for benchmark in results['benchmarks']:
+        if benchmark['name'] in baselineMeans:
+            oldMean = baselineMeans[benchmark['name']]
+            output.append((benchmark['name'], oldMean, benchmark['mean'], oldMean / benchmark['mean']))
+
+    return output
+
+#Format a time in seconds with a sensible unit
+def _format_time(seconds:float) -> str:
+    for unit, scale in (('sec', 1), ('ms', 1e-3), ('us', 1e-6)):
+        if seconds >= scale:
+            return f'{seconds / scale:.3g} {unit}'
+
+    return f'{seconds / 1e-9:.3g} ns'
+
+def _main(args:Union[list, None]=None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m KlebLib.benchmark', description='Benchmark fraction classes')
+    parser.add_argument('-o', '--output', help='write the results to this JSON file')
+    parser.add_argument('-b', '--baseline', help='compare the results with this JSON file')
+    parser.add_argument('-c', '--classes', nargs='+', choices=list(FRACTION_CLASSES), help='classes to benchmark')
+    parser.add_argument('-n', '--names', nargs='+', help='benchmarks to run')
+    parser.add_argument('-r', '--repeats', type=int, default=5)
+    parser.add_argument('--min-time', type=float, default=0.01, help='minimum time of each repeat in seconds')
+    parser.add_argument('--threshold', type=float, default=1.1, help='slowdown ratio to report as a regression')
+    options = parser.parse_args(args)
+
+    results = run_benchmarks(options.classes, options.names, options.repeats, options.min_time)
+    for benchmark in results['benchmarks']:
+        print(f'{benchmark["name"]}: Mean +- std dev: {_format_time(benchmark["mean"])} +- {_format_time(benchmark["stdev"])}')
+
+    if options.output:
+        with open(options.output, 'w') as file:
+            json.dump(results, file, indent=4)
+
+    regressions = 0
+    if options.baseline:
+        with open(options.baseline) as file:
+            baseline = json.load(file)
+
+        print()
+        for name, oldMean, newMean, ratio in compare_results(results, baseline):
+            if ratio >= 1:
+                change = f'{ratio:.2f}x faster'
+            else:
+                change = f'{1 / ratio:.2f}x slower'
+                if 1 / ratio >= options.threshold:
+                    regressions += 1
+                    change += ' (regression)'
+
+            print(f'{name}: {_format_time(oldMean)} -> {_format_time(newMean)}: {change}')
+
+    return 1 if regressions else 0
+
+if __name__ == '__main__':
+    raise SystemExit(_main())
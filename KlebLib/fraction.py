@@ -1,6 +1,15 @@
+import csv
 import re
-from typing import Union
+import sys
+from collections import OrderedDict
+from decimal import Decimal
+from itertools import islice, repeat
+from math import gcd, isfinite
+from operator import ge, gt, le, lt
+from typing import Iterable, Union
 
+#A float is taken at its exact binary value, the same in construction, arithmetic and comparison, so Fraction(0.1) == 0.1
+#from_float with maxDem gives the closest fraction with a small denominator, such as 1/10 for 0.1
 class Fraction:
     def __init__(self, fraction:Union[list, str, int, float]):
         self.skipSimplify = True
@@ -10,15 +19,22 @@ class Fraction:
             self.dem = fraction[1]
             
         elif type(fraction) is str:
-            fractionNums = fraction.split('/')
-            fractionNums = [int(i) for i in fractionNums]
+            fractionNums = _parse_nums(fraction)
             self.num = fractionNums[0]
             self.dem = fractionNums[1]
 
-        elif type(fraction) is int or type(fraction) is float:
-            fractionNums = self._num_to_fraction(fraction)
+        elif type(fraction) is int:
+            self.num = fraction
+            self.dem = 1
+
+        elif type(fraction) is float:
+            fractionNums = fraction.as_integer_ratio()
             self.num = fractionNums[0]
             self.dem = fractionNums[1]
+
+        elif type(fraction) is FrozenFraction:
+            self.num = fraction.num
+            self.dem = fraction.dem
             
         else:
             raise TypeError(f'cannot parse type {type(fraction).__name__}')
@@ -37,6 +53,9 @@ class Fraction:
     #Get the greatest common divisor of the numerator and denominator
     @property
     def GCD(self) -> int:
+        if type(self.num) is int and type(self.dem) is int:
+            return gcd(self.num, self.dem)
+
         num1 = self.num
         num2 = self.dem
 
@@ -63,14 +82,18 @@ class Fraction:
         num = self.num
         dem = self.dem
 
+        if dem == 0:
+            raise ZeroDivisionError('fraction denominator cannot be zero')
+
         #Ensure that negatives are represented in the numerator and there is no double negative
         if dem < 0:
             #print('flipping negatives') #debug
             num = -num
             dem = -dem
 
-        num //= self.GCD
-        dem //= self.GCD
+        divisor = self.GCD
+        num //= divisor
+        dem //= divisor
 
         self.num = num
         self.dem = dem
@@ -96,7 +119,10 @@ class Fraction:
 
     #Output the fraction as an int
     def __int__(self) -> int:
-        return int(self.num / self.dem)
+        if type(self.num) is int and type(self.dem) is int:
+            return self.__trunc__()
+        else:
+            return int(self.num / self.dem)
 
     #Output the fraction as a float
     def __float__(self) -> float:
@@ -104,23 +130,47 @@ class Fraction:
 
     #Compares this fraction to another
     def __eq__(self, other):
-        return self.num == other.num and self.dem == other.dem
+        if type(other) is Fraction:
+            return self.num == other.num and self.dem == other.dem
+
+        return _equals(self.num, self.dem, other)
 
     #Compares this fraction to another and inverts
     def __ne__(self, other):
-        return not self.__eq__(other)
+        equal = self.__eq__(other)
+        return equal if equal is NotImplemented else not equal
 
+    #Comparisons between two fractions cross-multiply, as both denominators are positive
     def __gt__(self, other):
-        return float(self) > float(other)
+        if type(other) is Fraction:
+            return self.num * other.dem > other.num * self.dem
+
+        return _compare(self.num, self.dem, other, gt)
 
     def __ge__(self, other):
-        return float(self) >= float(other)
+        if type(other) is Fraction:
+            return self.num * other.dem >= other.num * self.dem
+
+        return _compare(self.num, self.dem, other, ge)
 
     def __lt__(self, other):
-        return float(self) < float(other)
+        if type(other) is Fraction:
+            return self.num * other.dem < other.num * self.dem
+
+        return _compare(self.num, self.dem, other, lt)
 
     def __le__(self, other):
-        return float(self) <= float(other)
+        if type(other) is Fraction:
+            return self.num * other.dem <= other.num * self.dem
+
+        return _compare(self.num, self.dem, other, le)
+
+    #Equal fractions, ints and floats share a hash, but changing the fraction changes its hash
+    def __hash__(self) -> int:
+        if type(self.num) is int and type(self.dem) is int:
+            return _hash_fraction(self.num, self.dem)
+        else:
+            return hash(self.num / self.dem)
 
     #Adds two given fractions
     def _add(self, fraction1, fraction2):
@@ -226,10 +276,7 @@ class Fraction:
             except TypeError:
                 raise TypeError(f'Cannot add type {type(other)} to fraction')
                 
-        answer = self._add(self, other)
-        
-        self.num = answer.num
-        self.dem = answer.dem
+        self._replace(self._add(self, other))
         return self
 
     #Subtracts another fraction from this one and replaces this fraction with the result
@@ -240,10 +287,7 @@ class Fraction:
             except TypeError:
                 raise TypeError(f'Cannot add type {type(other)} to fraction')
                 
-        answer = self._sub(self, other)
-        
-        self.num = answer.num
-        self.dem = answer.dem
+        self._replace(self._sub(self, other))
         return self
 
     #Multiplies this fraction by another one and replaces this fraction with the result
@@ -254,10 +298,7 @@ class Fraction:
             except TypeError:
                 raise TypeError(f'Cannot add type {type(other)} to fraction')
                 
-        answer = self._mul(self, other)
-        
-        self.num = answer.num
-        self.dem = answer.dem
+        self._replace(self._mul(self, other))
         return self
 
     #Divides this fraction by another one and replaces this fraction with the result
@@ -268,16 +309,115 @@ class Fraction:
             except TypeError:
                 raise TypeError(f'Cannot add type {type(other)} to fraction')
                 
-        answer = self._truediv(self, other)
-        
+        self._replace(self._truediv(self, other))
+        return self
+
+    #Replaces this fraction with an already simplified answer, without simplifying again
+    def _replace(self, answer) -> None:
+        self.skipSimplify = True
         self.num = answer.num
         self.dem = answer.dem
-        return self
+
+    #Raises this fraction to a power, exactly if the power is an integer
+    def __pow__(self, exponent):
+        if type(exponent) is Fraction or type(exponent) is FrozenFraction:
+            if exponent.dem != 1:
+                return float(self) ** float(exponent)
+            exponent = exponent.num
+
+        if type(exponent) is int:
+            return Fraction._from_normalized(*_pow_nums(self.num, self.dem, exponent))
+        elif type(exponent) is float:
+            return float(self) ** exponent
+        else:
+            return NotImplemented
+
+    def __rpow__(self, base):
+        if self.dem != 1:
+            return float(base) ** float(self)
+        elif type(base) is int:
+            return Fraction._from_normalized(*_pow_nums(base, 1, self.num))
+        elif type(base) is float:
+            return base ** self.num
+        else:
+            return NotImplemented
+
+    def __floordiv__(self, other):
+        nums = _other_nums(other)
+        if nums is None:
+            return NotImplemented
+
+        return _floordiv_nums(self.num, self.dem, *nums)
+
+    def __rfloordiv__(self, other):
+        nums = _other_nums(other)
+        if nums is None:
+            return NotImplemented
+
+        return _floordiv_nums(*nums, self.num, self.dem)
+
+    def __mod__(self, other):
+        nums = _other_nums(other)
+        if nums is None:
+            return NotImplemented
+
+        return Fraction._from_nums(*_mod_nums(self.num, self.dem, *nums))
+
+    def __rmod__(self, other):
+        nums = _other_nums(other)
+        if nums is None:
+            return NotImplemented
+
+        return Fraction._from_nums(*_mod_nums(*nums, self.num, self.dem))
+
+    def __divmod__(self, other):
+        nums = _other_nums(other)
+        if nums is None:
+            return NotImplemented
+
+        return _floordiv_nums(self.num, self.dem, *nums), Fraction._from_nums(*_mod_nums(self.num, self.dem, *nums))
+
+    def __rdivmod__(self, other):
+        nums = _other_nums(other)
+        if nums is None:
+            return NotImplemented
+
+        return _floordiv_nums(*nums, self.num, self.dem), Fraction._from_nums(*_mod_nums(*nums, self.num, self.dem))
+
+    #Rounds to the nearest int, or to a fraction with ndigits decimal places, with halves rounded to even
+    def __round__(self, ndigits:int=None):
+        if ndigits is None:
+            return _round_nums(self.num, self.dem)
+
+        shift = 10 ** abs(ndigits)
+        if ndigits > 0:
+            return Fraction._from_nums(_round_nums(self.num * shift, self.dem), shift)
+        else:
+            return Fraction._from_normalized(_round_nums(self.num, self.dem * shift) * shift, 1)
+
+    def __floor__(self) -> int:
+        return self.num // self.dem
+
+    def __ceil__(self) -> int:
+        return -(-self.num // self.dem)
+
+    def __trunc__(self) -> int:
+        if self.num < 0:
+            return -(-self.num // self.dem)
+        else:
+            return self.num // self.dem
 
     #Flips this fraction between positive and negative
     def __neg__(self):
         return Fraction([-self.num, self.dem])
 
+    def __abs__(self):
+        return Fraction._from_normalized(abs(self.num), self.dem)
+
+    #A fraction is only false if it is zero
+    def __bool__(self):
+        return self.num != 0
+
     #Updates this fraction to its reciprocal
     def invert(self):
         return Fraction([self.dem, self.num])
@@ -293,29 +433,22 @@ class Fraction:
     
     #Returns a mixed fraction
     @property
-    def mixed(self):
-        integerPart = 0
-        num = self.num
-        dem = self.dem
-
-        while num > dem:
-            num -= dem
-            integerPart += 1
-
-        return [integerPart, [num, dem]]
+    def mixed(self) -> list:
+        return _mixed(self.num, self.dem)
 
     #Sets the fraction to the top-heavy form of a given mixed fraction
     @mixed.setter
     def mixed(self, fraction:Union[str, list]):
         #Fraction given in form [integerPart, [num, dem]] or 'integerPart num/dem'
         if type(fraction) is str:
-            fraction = fraction.split(' ')
-            temp = [int(i) for i in fraction[1].split('/')]
-            fraction = [int(fraction[0]), temp]
-            
-        fraction[1][0] += fraction[0] * fraction[1][1]
-        self.num = fraction[1][0]
-        self.dem = fraction[1][1]
+            num, dem = _parse_mixed(fraction)
+        else:
+            num, dem = _mixed_to_nums(fraction[0], fraction[1][0], fraction[1][1])
+
+        self.skipSimplify = True
+        self.num = num
+        self.dem = dem
+        self._simplify()
 
     #Returns a list of the numerator and denominator
     @property
@@ -330,11 +463,881 @@ class Fraction:
 
         self.simplify()
 
+    #Floats are converted exactly, the same as in comparisons, so that arithmetic and ordering agree
     def _num_to_fraction(self, number):
-        if round(number, 0) == number:
-            return Fraction([number, 1])
+        if type(number) is int:
+            return Fraction._from_normalized(number, 1)
+        elif type(number) is float:
+            return Fraction._from_normalized(*number.as_integer_ratio())
+        elif type(number) is FrozenFraction:
+            return Fraction(number)
+        else:
+            raise TypeError(f'cannot convert type {type(number).__name__} to fraction')
+
+    #Create a fraction from a numerator and denominator that are already simplified
+    @classmethod
+    def _from_normalized(cls, num:int, dem:int):
+        fraction = object.__new__(cls)
+        fraction.__dict__.update(skipSimplify=False, num=num, dem=dem)
+        return fraction
+
+    #Create a fraction from any integer numerator and denominator, with the denominator non-zero
+    @classmethod
+    def _from_nums(cls, num:int, dem:int):
+        if dem < 0:
+            num = -num
+            dem = -dem
+
+        divisor = gcd(num, dem)
+        return cls._from_normalized(num // divisor, dem // divisor)
+
+    #Parse many strings, returning the fractions and a list of (index, string, error message) for rows that failed
+    @classmethod
+    def parse_many(cls, strings:Iterable, start:int=0) -> tuple:
+        return _parse_many(cls, strings, start)
+
+_NUMBER = r'[+-]?(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?'
+_FRACTION_PATTERN = re.compile(rf'\s*({_NUMBER})\s*(?:/\s*({_NUMBER})\s*)?')
+
+#Get the numerator and denominator of an int or decimal string
+def _parse_number(string:str) -> tuple:
+    if '.' in string or 'e' in string or 'E' in string:
+        return Decimal(string).as_integer_ratio()
+    else:
+        return int(string), 1
+
+#Get the simplified numerator and denominator of a string such as '3/4', ' -3 / -4 ', '1.25' or '7'
+def _parse_nums(string:str) -> tuple:
+    #Fast path for plain 'num/dem' strings
+    parts = string.split('/')
+    try:
+        num = int(parts[0])
+        dem = int(parts[1]) if len(parts) == 2 else 1
+        fastPath = len(parts) <= 2
+    except ValueError:
+        fastPath = False
+
+    if not fastPath:
+        match = _FRACTION_PATTERN.fullmatch(string)
+        if match is None:
+            raise ValueError(f'cannot parse fraction {string!r}') from None
+
+        num, dem = _parse_number(match[1])
+        if match[2] is not None:
+            otherNum, otherDem = _parse_number(match[2])
+            num *= otherDem
+            dem *= otherNum
+
+    if dem == 0:
+        raise ZeroDivisionError(f'fraction denominator cannot be zero in {string!r}')
+    if dem < 0:
+        num = -num
+        dem = -dem
+
+    divisor = gcd(num, dem)
+    if divisor != 1:
+        num //= divisor
+        dem //= divisor
+
+    return num, dem
+
+#The number of rows that _parse_nums_many converts at once
+PARSE_CHUNK = 16384
+
+#Parse many strings into lists of numerators and denominators, which are not simplified, and a list of (index, string, error message) for rows that failed
+#Each chunk of rows that are all plain 'num/dem' strings is split and converted to ints in a few passes over the whole chunk
+#A chunk with any other row is parsed one row at a time, so that one bad row only slows down its own chunk
+def _parse_nums_many(strings:Iterable, start:int) -> tuple:
+    nums = []
+    dems = []
+    errors = []
+    strings = iter(strings)
+    while True:
+        chunk = list(islice(strings, PARSE_CHUNK))
+        if not chunk:
+            return nums, dems, errors
+
+        if list(map(str.count, chunk, repeat('/', len(chunk)))).count(1) == len(chunk):
+            try:
+                values = list(map(int, '/'.join(chunk).split('/')))
+            except ValueError:
+                values = None
+
+            if values is not None and 0 not in values[1::2]:
+                nums += values[0::2]
+                dems += values[1::2]
+                start += len(chunk)
+                continue
+
+        for i, string in enumerate(chunk, start):
+            try:
+                num, dem = _parse_nums(string)
+            except (ValueError, ZeroDivisionError) as error:
+                errors.append((i, string, str(error)))
+            else:
+                nums.append(num)
+                dems.append(dem)
+
+        start += len(chunk)
+
+def _parse_many(cls, strings:Iterable, start:int) -> tuple:
+    nums, dems, errors = _parse_nums_many(strings, start)
+    fromNormalized = cls._from_normalized
+    fractions = []
+    append = fractions.append
+    for num, dem in zip(nums, dems):
+        if dem < 0:
+            num = -num
+            dem = -dem
+
+        divisor = gcd(num, dem)
+        if divisor != 1:
+            num //= divisor
+            dem //= divisor
+
+        append(fromNormalized(num, dem))
+
+    return fractions, errors
+
+#Read the strings of a file with one per line, or of one column of a CSV file, giving (line number of the first row, rows) for each chunk of up to chunkSize rows
+def _read_strings(path:str, column:Union[int, str], delimiter:str, header:bool, chunkSize:int):
+    with open(path, newline='') as file:
+        if column is None:
+            if header:
+                next(file, None)
+            start = 2 if header else 1
+            rows = file
+            #The line endings of a whole chunk are stripped at once
+            strings = lambda lines: list(map(str.rstrip, lines, repeat('\r\n', len(lines))))
+        else:
+            rows = csv.reader(file, delimiter=delimiter)
+            if type(column) is str:
+                names = next(rows, [])
+                if column not in names:
+                    raise KeyError(f'column {column!r} not found in header')
+                column = names.index(column)
+                header = False
+                start = 2
+            else:
+                start = 1
+
+            if header:
+                next(rows, None)
+                start = 2
+
+            strings = lambda chunk: [row[column] if column < len(row) else '' for row in chunk]
+
+        while True:
+            chunk = list(islice(rows, chunkSize))
+            if not chunk:
+                return
+
+            yield start, strings(chunk)
+            start += len(chunk)
+
+#Read fractions from a file with one per line, or from one column of a CSV file, given by index or header name
+#The file is read as it is iterated, giving (fractions, errors) for each chunk of up to chunkSize rows, where each error has the row's line number
+def read_fractions(path:str, column:Union[int, str]=None, delimiter:str=',', header:bool=False, frozen:bool=False, chunkSize:int=65536):
+    cls = FrozenFraction if frozen else Fraction
+    for start, chunk in _read_strings(path, column, delimiter, header, chunkSize):
+        yield cls.parse_many(chunk, start)
+
+#Get the closest numerator and denominator to num/dem with a denominator of at most maxDem, using continued fractions
+def _limit_denominator(num:int, dem:int, maxDem:int) -> tuple:
+    if dem <= maxDem:
+        return num, dem
+
+    p0, q0, p1, q1 = 0, 1, 1, 0
+    n, d = num, dem
+    while True:
+        a = n // d
+        q2 = q0 + a * q1
+        if q2 > maxDem:
+            break
+
+        p0, q0, p1, q1 = p1, q1, p0 + a * p1, q2
+        n, d = d, n - a * d
+
+    #Choose between the last convergent and the best semiconvergent
+    k = (maxDem - q0) // q1
+    if 2 * d * (q0 + k * q1) <= dem:
+        return p1, q1
+    else:
+        return p0 + k * p1, q0 + k * q1
+
+#Get the numerator and denominator of a float, either exactly or limited to a maximum denominator
+def float_to_nums(number:float, maxDem:int=None) -> tuple:
+    if type(number) is int:
+        return number, 1
+    elif type(number) is not float:
+        raise TypeError(f'expected float, got {type(number).__name__}')
+
+    num, dem = number.as_integer_ratio()
+    if maxDem is not None:
+        if maxDem < 1:
+            raise ValueError('maxDem must be at least 1')
+        num, dem = _limit_denominator(num, dem, maxDem)
+
+    return num, dem
+
+#Convert a float to a fraction, either exactly or limited to a maximum denominator
+def from_float(number:float, maxDem:int=None, frozen:bool=False) -> Union[Fraction, 'FrozenFraction']:
+    cls = FrozenFraction if frozen else Fraction
+    return cls._from_normalized(*float_to_nums(number, maxDem))
+
+#Convert every float in an iterable to a fraction, either exactly or limited to a maximum denominator
+def from_floats(numbers:Iterable, maxDem:int=None, frozen:bool=False) -> list:
+    fromNormalized = FrozenFraction._from_normalized if frozen else Fraction._from_normalized
+    if maxDem is None:
+        return [fromNormalized(num, dem) for num, dem in map(float_to_nums, numbers)]
+
+    if maxDem < 1:
+        raise ValueError('maxDem must be at least 1')
+
+    output = []
+    for number in numbers:
+        num, dem = float_to_nums(number)
+        output.append(fromNormalized(*_limit_denominator(num, dem, maxDem)))
+
+    return output
+
+#Hash a fraction in the same way as int, float and fractions.Fraction, so that equal values share a hash
+def _hash_fraction(num:int, dem:int) -> int:
+    try:
+        inverse = pow(dem, -1, sys.hash_info.modulus)
+    except ValueError:
+        #The denominator is a multiple of the modulus
+        hashValue = sys.hash_info.inf
+    else:
+        hashValue = hash(hash(abs(num)) * inverse)
+
+    result = hashValue if num >= 0 else -hashValue
+    return -2 if result == -1 else result
+
+#Split num/dem into [integerPart, [num, dem]], with the sign on the integer part, or on num if the integer part is 0
+def _mixed(num:int, dem:int) -> list:
+    integerPart, remainder = divmod(abs(num), dem)
+    if num >= 0:
+        return [integerPart, [remainder, dem]]
+    elif integerPart:
+        return [-integerPart, [remainder, dem]]
+    else:
+        return [0, [-remainder, dem]]
+
+#Get the top-heavy numerator and denominator of a mixed fraction
+def _mixed_to_nums(integerPart:int, num:int, dem:int) -> tuple:
+    if dem == 0:
+        raise ZeroDivisionError('fraction denominator cannot be zero')
+
+    if integerPart < 0:
+        return integerPart * dem - num, dem
+    else:
+        return integerPart * dem + num, dem
+
+#Get the top-heavy numerator and denominator of a string in form 'integerPart num/dem', 'num/dem' or 'integerPart'
+def _parse_mixed(string:str) -> tuple:
+    parts = string.split()
+    if len(parts) == 2:
+        integerPart = int(parts[0])
+        fractionNums = parts[1].split('/')
+    elif len(parts) == 1 and '/' in parts[0]:
+        integerPart = 0
+        fractionNums = parts[0].split('/')
+    elif len(parts) == 1:
+        return int(parts[0]), 1
+    else:
+        raise ValueError(f'cannot parse mixed fraction {string!r}')
+
+    if len(fractionNums) != 2:
+        raise ValueError(f'cannot parse mixed fraction {string!r}')
+    return _mixed_to_nums(integerPart, int(fractionNums[0]), int(fractionNums[1]))
+
+#Format every fraction in an iterable as a mixed fraction string in form 'integerPart num/dem'
+def format_mixed(fractions:Iterable) -> list:
+    output = []
+    for fraction in fractions:
+        nums = _other_nums(fraction)
+        if nums is None:
+            raise TypeError(f'cannot format type {type(fraction).__name__} as a mixed fraction')
+
+        integerPart, (num, dem) = _mixed(*nums)
+        output.append(f'{integerPart} {num}/{dem}')
+
+    return output
+
+#Parse every mixed fraction string in an iterable into a fraction
+def parse_mixed(strings:Iterable, frozen:bool=False) -> list:
+    fromNums = FrozenFraction._from_nums if frozen else Fraction._from_nums
+    return [fromNums(*_parse_mixed(string)) for string in strings]
+
+#Raise num/dem to an integer power, by repeated squaring through int.__pow__
+#num and dem are coprime, so their powers are too and no simplification is needed
+def _pow_nums(num:int, dem:int, exponent:int) -> tuple:
+    if exponent >= 0:
+        return num ** exponent, dem ** exponent
+    elif num == 0:
+        raise ZeroDivisionError('zero fraction cannot be raised to a negative power')
+    elif num < 0:
+        return (-dem) ** -exponent, (-num) ** -exponent
+    else:
+        return dem ** -exponent, num ** -exponent
+
+#Floor divide num1/dem1 by num2/dem2, returning an int
+def _floordiv_nums(num1:int, dem1:int, num2:int, dem2:int) -> int:
+    if num2 == 0:
+        raise ZeroDivisionError('division by zero fraction')
+
+    return (num1 * dem2) // (dem1 * num2)
+
+#Get the numerator and denominator of num1/dem1 modulo num2/dem2, which take the sign of num2
+def _mod_nums(num1:int, dem1:int, num2:int, dem2:int) -> tuple:
+    if num2 == 0:
+        raise ZeroDivisionError('modulo by zero fraction')
+
+    return (num1 * dem2) % (dem1 * num2), dem1 * dem2
+
+#Round num/dem to the nearest int, with halves rounded to even
+def _round_nums(num:int, dem:int) -> int:
+    floor, remainder = divmod(num, dem)
+    if remainder * 2 < dem:
+        return floor
+    elif remainder * 2 > dem:
+        return floor + 1
+    elif floor % 2 == 0:
+        return floor
+    else:
+        return floor + 1
+
+#Get the numerator and denominator of another value, or None if it cannot be used as a fraction
+#A float is taken at its exact value, as in _equals and _compare, so that arithmetic agrees with comparison and hashing
+def _other_nums(other) -> Union[tuple, None]:
+    if type(other) is FrozenFraction or type(other) is Fraction:
+        return other.num, other.dem
+    elif type(other) is int:
+        return other, 1
+    elif type(other) is float:
+        return other.as_integer_ratio()
+    else:
+        return None
+
+#Check whether the fraction num/dem is exactly equal to another value, or return NotImplemented
+def _equals(num:int, dem:int, other) -> bool:
+    if type(other) is Fraction or type(other) is FrozenFraction:
+        return num == other.num and dem == other.dem
+    elif type(other) is int:
+        return dem == 1 and num == other
+    elif type(other) is float:
+        return isfinite(other) and (num, dem) == other.as_integer_ratio()
+    else:
+        return NotImplemented
+
+#Compare the fraction num/dem with another value exactly, without converting either to float
+def _compare(num:int, dem:int, other, operation) -> bool:
+    if type(other) is Fraction or type(other) is FrozenFraction:
+        return operation(num * other.dem, other.num * dem)
+    elif type(other) is int:
+        return operation(num, other * dem)
+    elif type(other) is float:
+        if not isfinite(other):
+            #Every fraction compares with inf and nan in the same way as 0 does
+            return operation(0.0, other)
+
+        otherNum, otherDem = other.as_integer_ratio()
+        return operation(num * otherDem, otherNum * dem)
+    else:
+        return NotImplemented
+
+#Convert a numerator and denominator given as floats into ints
+def _int_nums(num, dem) -> tuple:
+    num, dem = Fraction([num, dem]).nums
+    if num != int(num) or dem != int(dem):
+        raise ValueError(f'cannot represent {num}/{dem} with an integer numerator and denominator')
+
+    return int(num), int(dem)
+
+class FrozenFraction:
+    #An immutable fraction that is simplified once, when it is created
+    #Floats are taken at their exact value, as they are by Fraction
+    __slots__ = ('_num', '_dem')
+
+    #Built in __new__ rather than __init__ so that interned instances can be returned
+    def __new__(cls, fraction:Union[list, tuple, str, int, float, Fraction]):
+        if type(fraction) is int:
+            num = fraction
+            dem = 1
+
+        elif type(fraction) is list or type(fraction) is tuple:
+            num = fraction[0]
+            dem = fraction[1]
+
+        elif type(fraction) is Fraction or type(fraction) is FrozenFraction:
+            num = fraction.num
+            dem = fraction.dem
+
+        elif type(fraction) is float:
+            num, dem = fraction.as_integer_ratio()
+
+        elif type(fraction) is str:
+            num, dem = _parse_nums(fraction)
+
+        else:
+            raise TypeError(f'cannot parse type {type(fraction).__name__}')
+
+        if type(num) is not int or type(dem) is not int:
+            num, dem = _int_nums(num, dem)
+
+        if dem == 0:
+            raise ZeroDivisionError('fraction denominator cannot be zero')
+
+        #Ensure that negatives are represented in the numerator
+        if dem < 0:
+            num = -num
+            dem = -dem
+
+        divisor = gcd(num, dem)
+        if divisor != 1:
+            num //= divisor
+            dem //= divisor
+
+        return cls._from_normalized(num, dem)
+
+    #Create a fraction from a numerator and denominator that are already simplified
+    @classmethod
+    def _from_normalized(cls, num:int, dem:int):
+        if _internCache is not None and cls is FrozenFraction:
+            return _internCache.get(num, dem)
+
+        fraction = object.__new__(cls)
+        fraction._num = num
+        fraction._dem = dem
+        return fraction
+
+    #Create a fraction from any numerator and denominator, with the denominator non-zero
+    @classmethod
+    def _from_nums(cls, num:int, dem:int):
+        if dem < 0:
+            num = -num
+            dem = -dem
+
+        divisor = gcd(num, dem)
+        if divisor != 1:
+            num //= divisor
+            dem //= divisor
+
+        return cls._from_normalized(num, dem)
+
+    #Parse many strings, returning the fractions and a list of (index, string, error message) for rows that failed
+    @classmethod
+    def parse_many(cls, strings:Iterable, start:int=0) -> tuple:
+        return _parse_many(cls, strings, start)
+
+    @property
+    def num(self) -> int:
+        return self._num
+
+    @property
+    def dem(self) -> int:
+        return self._dem
+
+    #Returns a list of the numerator and denominator
+    @property
+    def nums(self) -> list:
+        return [self._num, self._dem]
+
+    #Returns a mixed fraction
+    @property
+    def mixed(self) -> list:
+        return _mixed(self._num, self._dem)
+
+    #Output the numbers as a fraction
+    def __str__(self) -> str:
+        return f'{self._num}/{self._dem}'
+
+    def __repr__(self) -> str:
+        return f'fraction.FrozenFraction([{self._num}, {self._dem}])'
+
+    #Output the fraction as an int
+    def __int__(self) -> int:
+        return self.__trunc__()
+
+    #Output the fraction as a float
+    def __float__(self) -> float:
+        return self._num / self._dem
+
+    def __hash__(self) -> int:
+        return _hash_fraction(self._num, self._dem)
+
+    def __eq__(self, other):
+        if type(other) is FrozenFraction:
+            return self._num == other._num and self._dem == other._dem
+
+        return _equals(self._num, self._dem, other)
+
+    def __lt__(self, other):
+        if type(other) is FrozenFraction:
+            return self._num * other._dem < other._num * self._dem
+
+        return _compare(self._num, self._dem, other, lt)
+
+    def __gt__(self, other):
+        if type(other) is FrozenFraction:
+            return self._num * other._dem > other._num * self._dem
+
+        return _compare(self._num, self._dem, other, gt)
+
+    def __le__(self, other):
+        if type(other) is FrozenFraction:
+            return self._num * other._dem <= other._num * self._dem
+
+        return _compare(self._num, self._dem, other, le)
+
+    def __ge__(self, other):
+        if type(other) is FrozenFraction:
+            return self._num * other._dem >= other._num * self._dem
+
+        return _compare(self._num, self._dem, other, ge)
+
+    def __add__(self, other):
+        nums = _other_nums(other)
+        if nums is None:
+            return NotImplemented
+
+        return self._from_nums(self._num * nums[1] + self._dem * nums[0], self._dem * nums[1])
+
+    def __sub__(self, other):
+        nums = _other_nums(other)
+        if nums is None:
+            return NotImplemented
+
+        return self._from_nums(self._num * nums[1] - self._dem * nums[0], self._dem * nums[1])
+
+    def __mul__(self, other):
+        nums = _other_nums(other)
+        if nums is None:
+            return NotImplemented
+
+        return self._from_nums(self._num * nums[0], self._dem * nums[1])
+
+    def __truediv__(self, other):
+        nums = _other_nums(other)
+        if nums is None:
+            return NotImplemented
+        if nums[0] == 0:
+            raise ZeroDivisionError('division by zero fraction')
+
+        return self._from_nums(self._num * nums[1], self._dem * nums[0])
+
+    def __radd__(self, other):
+        nums = _other_nums(other)
+        if nums is None:
+            return NotImplemented
+
+        return self._from_nums(nums[0] * self._dem + nums[1] * self._num, nums[1] * self._dem)
+
+    def __rsub__(self, other):
+        nums = _other_nums(other)
+        if nums is None:
+            return NotImplemented
+
+        return self._from_nums(nums[0] * self._dem - nums[1] * self._num, nums[1] * self._dem)
+
+    def __rmul__(self, other):
+        return self.__mul__(other)
+
+    def __rtruediv__(self, other):
+        nums = _other_nums(other)
+        if nums is None:
+            return NotImplemented
+        if self._num == 0:
+            raise ZeroDivisionError('division by zero fraction')
+
+        return self._from_nums(nums[0] * self._dem, nums[1] * self._num)
+
+    #Raises this fraction to a power, exactly if the power is an integer
+    def __pow__(self, exponent):
+        if type(exponent) is Fraction or type(exponent) is FrozenFraction:
+            if exponent.dem != 1:
+                return float(self) ** float(exponent)
+            exponent = exponent.num
+
+        if type(exponent) is int:
+            return FrozenFraction._from_normalized(*_pow_nums(self._num, self._dem, exponent))
+        elif type(exponent) is float:
+            return float(self) ** exponent
+        else:
+            return NotImplemented
+
+    def __rpow__(self, base):
+        if self._dem != 1:
+            return float(base) ** float(self)
+        elif type(base) is int:
+            return FrozenFraction._from_normalized(*_pow_nums(base, 1, self._num))
+        elif type(base) is float:
+            return base ** self._num
+        else:
+            return NotImplemented
+
+    def __floordiv__(self, other):
+        nums = _other_nums(other)
+        if nums is None:
+            return NotImplemented
+
+        return _floordiv_nums(self._num, self._dem, *nums)
+
+    def __rfloordiv__(self, other):
+        nums = _other_nums(other)
+        if nums is None:
+            return NotImplemented
+
+        return _floordiv_nums(*nums, self._num, self._dem)
+
+    def __mod__(self, other):
+        nums = _other_nums(other)
+        if nums is None:
+            return NotImplemented
+
+        return FrozenFraction._from_nums(*_mod_nums(self._num, self._dem, *nums))
+
+    def __rmod__(self, other):
+        nums = _other_nums(other)
+        if nums is None:
+            return NotImplemented
+
+        return FrozenFraction._from_nums(*_mod_nums(*nums, self._num, self._dem))
+
+    def __divmod__(self, other):
+        nums = _other_nums(other)
+        if nums is None:
+            return NotImplemented
+
+        return _floordiv_nums(self._num, self._dem, *nums), FrozenFraction._from_nums(*_mod_nums(self._num, self._dem, *nums))
+
+    def __rdivmod__(self, other):
+        nums = _other_nums(other)
+        if nums is None:
+            return NotImplemented
+
+        return _floordiv_nums(*nums, self._num, self._dem), FrozenFraction._from_nums(*_mod_nums(*nums, self._num, self._dem))
+
+    #Rounds to the nearest int, or to a fraction with ndigits decimal places, with halves rounded to even
+    def __round__(self, ndigits:int=None):
+        if ndigits is None:
+            return _round_nums(self._num, self._dem)
+
+        shift = 10 ** abs(ndigits)
+        if ndigits > 0:
+            return FrozenFraction._from_nums(_round_nums(self._num * shift, self._dem), shift)
+        else:
+            return FrozenFraction._from_normalized(_round_nums(self._num, self._dem * shift) * shift, 1)
+
+    def __floor__(self) -> int:
+        return self._num // self._dem
+
+    def __ceil__(self) -> int:
+        return -(-self._num // self._dem)
+
+    def __trunc__(self) -> int:
+        if self._num < 0:
+            return -(-self._num // self._dem)
+        else:
+            return self._num // self._dem
+
+    #Flips this fraction between positive and negative
+    def __neg__(self):
+        return self._from_normalized(-self._num, self._dem)
+
+    def __abs__(self):
+        return self._from_normalized(abs(self._num), self._dem)
+
+    #A fraction is only false if it is zero
+    def __bool__(self):
+        return self._num != 0
+
+    #Returns the reciprocal of this fraction
+    def invert(self):
+        if self._num == 0:
+            raise ZeroDivisionError('cannot invert a zero fraction')
+
+        return self._from_nums(self._dem, self._num)
+
+    #Returns either the numerator or denominator, as if the fraction were a list in form [num, dem]
+    def __getitem__(self, index):
+        if index == 0:
+            return self._num
+        elif index == 1:
+            return self._dem
+        else:
+            raise IndexError(f'Invalid value for index: {index}. Must be 0 or 1')
+
+    def __reduce__(self):
+        return (FrozenFraction, ((self._num, self._dem),))
+
+class Accumulator:
+    #A running total that only simplifies when its value is read, or when its numbers grow past bitLimit bits
+    def __init__(self, start:Union[Fraction, FrozenFraction, int, float]=0, bitLimit:int=4096):
+        self.bitLimit = bitLimit
+        self._num, self._dem = self._nums(start)
+        self._simplified = True
+
+    def _nums(self, value) -> tuple:
+        nums = _other_nums(value)
+        if nums is None:
+            raise TypeError(f'cannot accumulate type {type(value).__name__}')
+
+        return nums
+
+    #Simplify if either number has grown past the limit
+    def _check_size(self) -> None:
+        self._simplified = False
+        if self._dem.bit_length() > self.bitLimit or self._num.bit_length() > self.bitLimit:
+            self._simplify()
+
+    def _simplify(self) -> None:
+        if not self._simplified:
+            divisor = gcd(self._num, self._dem)
+            self._num //= divisor
+            self._dem //= divisor
+            self._simplified = True
+
+    def add(self, other):
+        num, dem = self._nums(other)
+        return self._add_nums(num, dem)
+
+    def sub(self, other):
+        num, dem = self._nums(other)
+        return self._add_nums(-num, dem)
+
+    #Add num/dem, putting both over the lowest common multiple of their denominators
+    def _add_nums(self, num:int, dem:int):
+        if dem == self._dem:
+            self._num += num
         else:
-            decPlaces = len(str(number)[re.search(r'\.', str(number)).start() + 1:])
-            number *= 10 ** decPlaces
+            common = self._dem // gcd(self._dem, dem) * dem
+            self._num = self._num * (common // self._dem) + num * (common // dem)
+            self._dem = common
+
+        self._check_size()
+        return self
+
+    def mul(self, other):
+        num, dem = self._nums(other)
+        self._num *= num
+        self._dem *= dem
+
+        self._check_size()
+        return self
+
+    def truediv(self, other):
+        num, dem = self._nums(other)
+        if num == 0:
+            raise ZeroDivisionError('division by zero fraction')
+        if num < 0:
+            num = -num
+            dem = -dem
+
+        self._num *= dem
+        self._dem *= num
+
+        self._check_size()
+        return self
+
+    __iadd__ = add
+    __isub__ = sub
+    __imul__ = mul
+    __itruediv__ = truediv
+
+    #The simplified total as a fraction
+    @property
+    def value(self) -> Fraction:
+        self._simplify()
+        return Fraction._from_normalized(self._num, self._dem)
+
+    #The simplified total as a frozen fraction
+    @property
+    def frozen(self) -> FrozenFraction:
+        self._simplify()
+        return FrozenFraction._from_normalized(self._num, self._dem)
+
+    def __str__(self) -> str:
+        return str(self.value)
+
+    def __repr__(self) -> str:
+        return f'fraction.Accumulator({self.value!r})'
+
+#Add together every value in an iterable, simplifying only once at the end
+def sum_fractions(values:Iterable, start:Union[Fraction, FrozenFraction, int, float]=0) -> Fraction:
+    total = Accumulator(start)
+    for value in values:
+        total.add(value)
+
+    return total.value
+
+class _InternCache:
+    #Shares FrozenFraction instances between equal values
+    #Fractions with small numerators and denominators are kept forever, and any others are kept in a bounded LRU cache
+    def __init__(self, maxSize:int, smallLimit:int):
+        self.maxSize = maxSize
+        self.smallLimit = smallLimit
+        self.hits = 0
+        self.misses = 0
+        self._small = {}
+        self._recent = OrderedDict()
+
+    def get(self, num:int, dem:int) -> FrozenFraction:
+        key = (num, dem)
+        small = dem <= self.smallLimit and -self.smallLimit <= num <= self.smallLimit
+        cache = self._small if small else self._recent
+
+        fraction = cache.get(key)
+        if fraction is not None:
+            self.hits += 1
+            if not small:
+                cache.move_to_end(key)
+            return fraction
+
+        self.misses += 1
+        fraction = object.__new__(FrozenFraction)
+        fraction._num = num
+        fraction._dem = dem
+
+        if small:
+            cache[key] = fraction
+        elif self.maxSize > 0:
+            cache[key] = fraction
+            if len(cache) > self.maxSize:
+                cache.popitem(last=False)
+
+        return fraction
+
+    @property
+    def info(self) -> dict:
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'smallSize': len(self._small),
+            'size': len(self._recent),
+            'maxSize': self.maxSize,
+            'smallLimit': self.smallLimit
+        }
+
+_internCache = None
+
+#Make equal FrozenFractions share instances
+#Every fraction with |num| and dem of at most smallLimit is kept, along with up to maxSize of the most recent others
+def enable_interning(maxSize:int=4096, smallLimit:int=32) -> None:
+    global _internCache
+    if maxSize < 0 or smallLimit < 0:
+        raise ValueError('maxSize and smallLimit cannot be negative')
+
+    _internCache = _InternCache(maxSize, smallLimit)
+
+def disable_interning() -> None:
+    global _internCache
+    _internCache = None
+
+#Get the hit and miss counts and sizes of the intern cache, or None if interning is disabled
+def interning_info() -> Union[dict, None]:
+    if _internCache is None:
+        return None
 
-            return Fraction([number, 10 ** decPlaces])
\ No newline at end of file
+    return _internCache.info
\ No newline at end of file
@@ -0,0 +1,338 @@
+from math import gcd
+from operator import index
+from typing import Any, Iterable, Union
+from KlebLib.fraction import Fraction, FrozenFraction, _parse_nums, _parse_nums_many, _read_strings
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+__all__ = ['FractionArray']
+
+INT64_MAX = 2 ** 63 - 1
+
+#Get the numerator and denominator of a single value, following the same rules as fraction.Fraction
+#A float is taken at its exact value, in construction, arithmetic and comparison alike
+def _value_nums(value:Any) -> tuple:
+    if type(value) is int:
+        return value, 1
+    elif type(value) is Fraction or type(value) is FrozenFraction:
+        return value.num, value.dem
+    elif type(value) is str:
+        return _parse_nums(value)
+    elif type(value) is list or type(value) is tuple:
+        return _normalized_nums(value[0], value[1])
+    elif type(value) is float:
+        return value.as_integer_ratio()
+    else:
+        raise TypeError(f'cannot parse type {type(value).__name__}')
+
+#Get a numerator and denominator with a positive denominator and no common factor
+#FractionArray._operands bounds products by the size of each part, which only holds for a positive denominator
+def _normalized_nums(num:int, dem:int) -> tuple:
+    if dem == 0:
+        raise ZeroDivisionError('fraction denominator cannot be zero')
+    if dem < 0:
+        num = -num
+        dem = -dem
+
+    divisor = gcd(num, dem)
+    return num // divisor, dem // divisor
+
+#Get both buffers as int64 NumPy arrays, or None if any value does not fit
+#-2 ** 63 is left out so that every value can be negated
+def _int64_arrays(num:Union[list, Any], dem:Union[list, Any]) -> Union[tuple, None]:
+    arrays = []
+    for buffer in (num, dem):
+        if type(buffer) is list:
+            #NumPy raises OverflowError for ints that do not fit
+            try:
+                buffer = np.array(buffer, dtype=np.int64)
+            except OverflowError:
+                return None
+
+        if len(buffer) != 0 and (int(buffer.min()) < -INT64_MAX or int(buffer.max()) > INT64_MAX):
+            return None
+        arrays.append(buffer.astype(np.int64, copy=False))
+
+    return tuple(arrays)
+
+#Get the largest absolute value in a buffer
+def _max_abs(buffer:Union[list, Any]) -> int:
+    if len(buffer) == 0:
+        return 0
+    elif type(buffer) is list:
+        return max(max(buffer), -min(buffer))
+    else:
+        return int(np.abs(buffer).max())
+
+class FractionArray:
+    #An array of fractions, stored as parallel buffers of numerators and denominators
+    def __init__(self, values:Iterable=()):
+        num = []
+        dem = []
+        for value in values:
+            valueNum, valueDem = _value_nums(value)
+            num.append(valueNum)
+            dem.append(valueDem)
+
+        self._set(num, dem)
+
+    #Create an array from a sequence of numerators and a sequence of denominators, which must all be integers
+    @classmethod
+    def from_nums(cls, num:Iterable, dem:Iterable):
+        array = object.__new__(cls)
+        if np is not None and type(num) is np.ndarray and type(dem) is np.ndarray:
+            if num.dtype.kind not in 'iu' or dem.dtype.kind not in 'iu':
+                raise TypeError(f'numerators and denominators must be integer arrays, not {num.dtype} and {dem.dtype}')
+
+            #Arrays that do not fit in int64 are kept as Python ints rather than wrapped around
+            arrays = _int64_arrays(num, dem)
+            if arrays is None:
+                array._set(num.tolist(), dem.tolist())
+            else:
+                array._set(*arrays)
+        else:
+            array._set([index(i) for i in num], [index(i) for i in dem])
+
+        return array
+
+    #Parse many strings, returning an array of the fractions and a list of (index, string, error message) for rows that failed
+    #No object is created for each row, and the fractions are simplified all at once, which is much faster than Fraction.parse_many
+    @classmethod
+    def parse_many(cls, strings:Iterable, start:int=0) -> tuple:
+        num, dem, errors = _parse_nums_many(strings, start)
+        array = object.__new__(cls)
+        array._set(num, dem)
+        return array, errors
+
+    #Read fractions in the same way as fraction.read_fractions, giving (array, errors) for each chunk of up to chunkSize rows
+    @classmethod
+    def read(cls, path:str, column:Union[int, str]=None, delimiter:str=',', header:bool=False, chunkSize:int=65536):
+        for start, chunk in _read_strings(path, column, delimiter, header, chunkSize):
+            yield cls.parse_many(chunk, start)
+
+    #Store the given buffers after simplifying every fraction
+    def _set(self, num:Union[list, Any], dem:Union[list, Any]) -> None:
+        if len(num) != len(dem):
+            raise ValueError('numerators and denominators must be of the same length')
+
+        #Lists that fit in 64 bits are simplified as NumPy arrays, all at once
+        if type(num) is list and np is not None:
+            arrays = _int64_arrays(num, dem)
+            if arrays is not None:
+                num, dem = arrays
+
+        if type(num) is list:
+            num, dem = self._simplify_lists(num, dem)
+        else:
+            num, dem = self._simplify_arrays(num, dem)
+
+        self.num = num
+        self.dem = dem
+
+    def _simplify_lists(self, num:list, dem:list) -> tuple:
+        outputNum = []
+        outputDem = []
+        for valueNum, valueDem in zip(num, dem):
+            if valueDem == 0:
+                raise ZeroDivisionError('fraction denominator cannot be zero')
+            if valueDem < 0:
+                valueNum = -valueNum
+                valueDem = -valueDem
+
+            divisor = gcd(valueNum, valueDem)
+            outputNum.append(valueNum // divisor)
+            outputDem.append(valueDem // divisor)
+
+        return outputNum, outputDem
+
+    def _simplify_arrays(self, num, dem) -> tuple:
+        if (dem <= 0).any():
+            if (dem == 0).any():
+                raise ZeroDivisionError('fraction denominator cannot be zero')
+
+            sign = np.where(dem < 0, -1, 1)
+            num = num * sign
+            dem = dem * sign
+
+        divisor = np.gcd(num, dem)
+        return num // divisor, dem // divisor
+
+    #Which buffer type is in use, either 'numpy' or 'python'
+    @property
+    def backend(self) -> str:
+        return 'python' if type(self.num) is list else 'numpy'
+
+    #Get the buffers of the other operand, and the buffers of this array in a matching form
+    def _operands(self, other) -> tuple:
+        if type(other) is FractionArray:
+            if len(other) != len(self):
+                raise ValueError(f'cannot combine arrays of lengths {len(self)} and {len(other)}')
+            otherNum = other.num
+            otherDem = other.dem
+        else:
+            try:
+                otherNum, otherDem = _value_nums(other)
+            except TypeError:
+                return None
+
+        num = self.num
+        dem = self.dem
+        if type(num) is list or type(otherNum) is list:
+            fitsInt64 = False
+        else:
+            #Check that no product of a numerator and a denominator (or sum of two) can overflow
+            maxNum1, maxDem1 = _max_abs(num), _max_abs(dem)
+            if type(otherNum) is int:
+                maxNum2, maxDem2 = abs(otherNum), otherDem
+            else:
+                maxNum2, maxDem2 = _max_abs(otherNum), _max_abs(otherDem)
+
+            fitsInt64 = (
+                maxNum1 * maxDem2 + maxNum2 * maxDem1 <= INT64_MAX
+                and maxNum1 * maxNum2 <= INT64_MAX
+                and maxDem1 * maxDem2 <= INT64_MAX
+            )
+
+        if not fitsInt64:
+            num, dem = self._to_list(num), self._to_list(dem)
+            if type(otherNum) is not int:
+                otherNum, otherDem = self._to_list(otherNum), self._to_list(otherDem)
+
+        return num, dem, otherNum, otherDem
+
+    def _to_list(self, buffer) -> list:
+        return buffer if type(buffer) is list else buffer.tolist()
+
+    #Apply an operation to every pair of elements, broadcasting scalars
+    def _elementwise(self, operation, num1, dem1, num2, dem2) -> tuple:
+        if type(num1) is not list:
+            return operation(num1, dem1, num2, dem2)
+
+        if type(num2) is int:
+            num2 = [num2] * len(num1)
+            dem2 = [dem2] * len(num1)
+
+        results = [operation(*nums) for nums in zip(num1, dem1, num2, dem2)]
+        return [result[0] for result in results], [result[1] for result in results]
+
+    def _result(self, num, dem):
+        array = object.__new__(FractionArray)
+        array._set(num, dem)
+        return array
+
+    def __add__(self, other):
+        operands = self._operands(other)
+        if operands is None:
+            return NotImplemented
+
+        return self._result(*self._elementwise(lambda a, b, c, d: (a * d + c * b, b * d), *operands))
+
+    def __sub__(self, other):
+        operands = self._operands(other)
+        if operands is None:
+            return NotImplemented
+
+        return self._result(*self._elementwise(lambda a, b, c, d: (a * d - c * b, b * d), *operands))
+
+    def __mul__(self, other):
+        operands = self._operands(other)
+        if operands is None:
+            return NotImplemented
+
+        return self._result(*self._elementwise(lambda a, b, c, d: (a * c, b * d), *operands))
+
+    def __truediv__(self, other):
+        operands = self._operands(other)
+        if operands is None:
+            return NotImplemented
+
+        return self._result(*self._elementwise(lambda a, b, c, d: (a * d, b * c), *operands))
+
+    def __radd__(self, other):
+        return self.__add__(other)
+
+    def __rsub__(self, other):
+        operands = self._operands(other)
+        if operands is None:
+            return NotImplemented
+
+        return self._result(*self._elementwise(lambda a, b, c, d: (c * b - a * d, b * d), *operands))
+
+    def __rmul__(self, other):
+        return self.__mul__(other)
+
+    def __rtruediv__(self, other):
+        operands = self._operands(other)
+        if operands is None:
+            return NotImplemented
+
+        return self._result(*self._elementwise(lambda a, b, c, d: (c * b, d * a), *operands))
+
+    def __neg__(self):
+        array = object.__new__(FractionArray)
+        array.num = [-i for i in self.num] if type(self.num) is list else -self.num
+        array.dem = self.dem
+        return array
+
+    #Compare every pair of elements, returning a list of bools, or a NumPy array of bools with the numpy backend
+    def _compare(self, other, operation):
+        operands = self._operands(other)
+        if operands is None:
+            return NotImplemented
+
+        num1, dem1, num2, dem2 = operands
+        if type(num1) is not list:
+            return operation(num1 * dem2, num2 * dem1)
+
+        if type(num2) is int:
+            return [operation(a * dem2, num2 * b) for a, b in zip(num1, dem1)]
+
+        return [operation(a * d, c * b) for a, b, c, d in zip(num1, dem1, num2, dem2)]
+
+    def __eq__(self, other):
+        return self._compare(other, lambda a, b: a == b)
+
+    def __ne__(self, other):
+        return self._compare(other, lambda a, b: a != b)
+
+    def __lt__(self, other):
+        return self._compare(other, lambda a, b: a < b)
+
+    def __le__(self, other):
+        return self._compare(other, lambda a, b: a <= b)
+
+    def __gt__(self, other):
+        return self._compare(other, lambda a, b: a > b)
+
+    def __ge__(self, other):
+        return self._compare(other, lambda a, b: a >= b)
+
+    def __len__(self):
+        return len(self.num)
+
+    def __getitem__(self, index:int) -> Fraction:
+        return Fraction([int(self.num[index]), int(self.dem[index])])
+
+    def __iter__(self):
+        return iter(self.to_fractions())
+
+    def __str__(self) -> str:
+        return '[' + ', '.join(self.to_strings()) + ']'
+
+    def __repr__(self) -> str:
+        return f'fractionarray.FractionArray({self.to_strings()})'
+
+    def to_fractions(self) -> list:
+        return [Fraction([num, dem]) for num, dem in zip(self._to_list(self.num), self._to_list(self.dem))]
+
+    def to_strings(self) -> list:
+        return [f'{num}/{dem}' for num, dem in zip(self._to_list(self.num), self._to_list(self.dem))]
+
+    def to_floats(self) -> list:
+        if type(self.num) is list:
+            return [num / dem for num, dem in zip(self.num, self.dem)]
+        else:
+            return (self.num / self.dem).tolist()
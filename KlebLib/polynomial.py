@@ -1,17 +1,19 @@
 import re
-from typing import Union
-from copy import deepcopy
+from typing import Iterable, Union
+from KlebLib.fraction import Fraction, FrozenFraction
 
-__all__ = ['Polynomial']
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+__all__ = ['Polynomial', 'CompiledPolynomial']
 
 def get_variables(polynomial:Union[list, str]) -> list:
     variables = set()
 
     if type(polynomial) is str:
-        for character in polynomial:
-            #If it is a letter
-            if (ord(character) >= 65 and ord(character) <= 90) or (ord(character) >= 97 and ord(character) <= 122):
-                variables.add(character)
+        variables.update(_VARIABLE.findall(polynomial))
 
     elif type(polynomial) is list:
         for term in polynomial:
@@ -21,272 +23,617 @@ def get_variables(polynomial:Union[list, str]) -> list:
 
     return list(variables)
 
+#Translation tables between superscript digits and ordinary ones, built once
+_FROM_SUPERSCRIPT = str.maketrans('⁰¹²³⁴⁵⁶⁷⁸⁹⁻', '0123456789-')
+_TO_SUPERSCRIPT = str.maketrans('0123456789-', '⁰¹²³⁴⁵⁶⁷⁸⁹⁻')
+
+_VARIABLE = re.compile(r'[A-Za-z]')
+
+#Every token of a polynomial string, matched in one pass by a single pattern
+_TOKEN = re.compile(r'''
+    (?P<space>\s+)
+  | (?P<sign>[+-])
+  | (?P<number>\d+(?:\.\d*)?|\.\d+)
+  | (?P<variable>[A-Za-z])
+  | \^\s*(?P<power>[+-]?(?:\d+(?:\.\d*)?|\.\d+))
+  | (?P<superscript>⁻?[⁰¹²³⁴⁵⁶⁷⁸⁹]+)
+''', re.VERBOSE)
+
+def _parse_number(string:str) -> Union[int, float]:
+    return float(string) if '.' in string else int(string)
+
+#Parse a polynomial string such as '3x^2 - 2xy + 5', 'x²y - 1' or '-0.5a^-1', returning a dict of monomial keys and coefficients
+#An exponent can be written with ^, as superscript digits, or as digits straight after a variable
+def _parse_terms(string:str) -> dict:
+    terms = {}
+    sign = 1
+    signed = False
+    coefficient = None
+    exponents = {}
+    #The variable that an exponent would apply to, which is only set straight after a variable, and where that variable ends
+    variable = None
+    variableEnd = -1
+
+    position = 0
+    length = len(string)
+    match = _TOKEN.match
+    while position < length:
+        token = match(string, position)
+        if token is None:
+            raise ValueError(f'invalid character {string[position]!r} at position {position} in polynomial {string!r}')
+
+        position = token.end()
+        kind = token.lastgroup
+        if kind == 'space':
+            continue
+
+        if kind == 'variable':
+            variable = token.group('variable')
+            variableEnd = position
+            exponents[variable] = exponents.get(variable, 0) + 1
+            continue
+
+        if kind == 'sign':
+            if coefficient is not None or exponents:
+                _add_term(terms, _monomial(exponents), sign * (1 if coefficient is None else coefficient))
+                sign = 1
+                coefficient = None
+                exponents = {}
+
+            signed = True
+            if token.group('sign') == '-':
+                sign = -sign
+
+        #Digits straight after a variable are its exponent, as in 'x2'
+        elif kind == 'number' and (variable is None or token.start() != variableEnd):
+            if coefficient is not None or exponents:
+                raise ValueError(f'unexpected number at position {token.start()} in polynomial {string!r}')
+            coefficient = _parse_number(token.group('number'))
+
+        else:
+            if variable is None:
+                raise ValueError(f'exponent without a variable at position {token.start()} in polynomial {string!r}')
+
+            exponent = token.group(kind)
+            if kind == 'superscript':
+                exponent = exponent.translate(_FROM_SUPERSCRIPT)
+            exponents[variable] += _parse_number(exponent) - 1
+
+        variable = None
+
+    if coefficient is not None or exponents:
+        _add_term(terms, _monomial(exponents), sign * (1 if coefficient is None else coefficient))
+    elif signed:
+        raise ValueError(f'polynomial {string!r} ends with a sign')
+
+    return terms
+
+#Get the canonical key of a term's monomial: its variables and exponents as pairs, sorted by variable, leaving out variables to the power of zero
+def _monomial(term:dict) -> tuple:
+    return tuple(sorted((variable, exponent) for variable, exponent in term.items() if variable != 'num' and exponent != 0))
+
+#Get the key of a monomial with the exponent of one variable changed, leaving the variable out if the exponent is zero
+def _with_exponent(key:tuple, variable:str, exponent) -> tuple:
+    output = [pair for pair in key if pair[0] != variable]
+    if exponent != 0:
+        output.append((variable, exponent))
+        output.sort()
+
+    return tuple(output)
+
+#Coefficients are never changed in place, since a mutable fraction.Fraction can be shared between polynomials
+#A term whose coefficient becomes zero is removed, so that the terms never hold zeros
+def _add_term(terms:dict, key:tuple, coefficient) -> None:
+    if key in terms:
+        coefficient = terms[key] + coefficient
+
+    if coefficient:
+        terms[key] = coefficient
+    else:
+        terms.pop(key, None)
+
+#Multiply two monomials by adding their exponents
+def _multiply_monomials(first:tuple, second:tuple) -> tuple:
+    if not first:
+        return second
+    if not second:
+        return first
+
+    exponents = dict(first)
+    for variable, exponent in second:
+        exponents[variable] = exponents.get(variable, 0) + exponent
+
+    return tuple(sorted(pair for pair in exponents.items() if pair[1] != 0))
+
+#Get the coefficients of a polynomial in one variable with non-negative int exponents, indexed by exponent
+#Returns None if it is not of that form, or if fewer than minDensity of its coefficients are filled in
+def _dense(terms:dict, variable:Union[str, None], minDensity:float=0) -> Union[list, None]:
+    exponents = {}
+    for key, coefficient in terms.items():
+        if not key:
+            exponents[0] = coefficient
+        elif len(key) == 1 and key[0][0] == variable and key[0][1] == int(key[0][1]) and key[0][1] > 0:
+            exponents[int(key[0][1])] = coefficient
+        else:
+            return None
+
+    length = max(exponents) + 1 if exponents else 0
+    if len(exponents) < minDensity * length:
+        return None
+
+    coefficients = [0] * length
+    for exponent, coefficient in exponents.items():
+        coefficients[exponent] = coefficient
+
+    return coefficients
+
+#Get the terms of a polynomial in one variable from its coefficients, from the highest exponent down, leaving out zeros
+def _from_dense(coefficients:list, variable:str) -> dict:
+    terms = {}
+    for exponent in range(len(coefficients) - 1, -1, -1):
+        coefficient = coefficients[exponent]
+        if coefficient:
+            terms[((variable, exponent),) if exponent else ()] = coefficient
+
+    return terms
+
+#Below this many coefficients, Karatsuba multiplication hands over to schoolbook multiplication
+KARATSUBA_CUTOFF = 32
+
+#Dense multiplication is used when both polynomials have at least this many terms, filling at least this fraction of their coefficients
+DENSE_MIN_TERMS = 32
+DENSE_MIN_DENSITY = 0.5
+
+#Coefficients are always replaced rather than updated in place, for the same reason as in _add_term
+def _schoolbook_dense(first:list, second:list) -> list:
+    output = [0] * (len(first) + len(second) - 1)
+    for i, a in enumerate(first):
+        if a:
+            for j, b in enumerate(second):
+                output[i + j] = output[i + j] + a * b
+
+    return output
+
+def _add_dense(first:list, second:list) -> list:
+    return [a + b for a, b in zip(first, second)]
+
+#Multiply two coefficient lists of the same length by Karatsuba's method, which takes three half size products instead of four
+def _karatsuba(first:list, second:list) -> list:
+    length = len(first)
+    if length < KARATSUBA_CUTOFF:
+        return _schoolbook_dense(first, second)
+
+    half = length // 2
+    low1, high1 = first[:half], first[half:]
+    low2, high2 = second[:half], second[half:]
+    #The low halves are padded so that both halves of each operand are the same length
+    low1 += [0] * (len(high1) - half)
+    low2 += [0] * (len(high2) - half)
+
+    low = _karatsuba(low1, low2)
+    high = _karatsuba(high1, high2)
+    middle = _karatsuba(_add_dense(low1, high1), _add_dense(low2, high2))
+
+    output = [0] * (2 * length - 1)
+    for i, value in enumerate(low):
+        output[i] = output[i] + value
+        output[i + half] = output[i + half] - value
+    for i, value in enumerate(high):
+        output[i + 2 * half] = output[i + 2 * half] + value
+        output[i + half] = output[i + half] - value
+    for i, value in enumerate(middle):
+        output[i + half] = output[i + half] + value
+
+    return output
+
+#Multiply two coefficient lists, with NumPy's convolution for floats, and Karatsuba's method otherwise so that ints and fractions stay exact
+def _multiply_dense(first:list, second:list) -> list:
+    length = len(first) + len(second) - 1
+    if np is not None and all(type(value) is float for value in first) and all(type(value) is float for value in second):
+        return np.convolve(first, second).tolist()
+
+    size = max(len(first), len(second))
+    output = _karatsuba(first + [0] * (size - len(first)), second + [0] * (size - len(second)))
+    return output[:length]
+
+#Get the exponents of a monomial as a tuple over the given variables
+def _exponents(key:tuple, variables:list) -> tuple:
+    exponents = dict(key)
+    return tuple(exponents.get(variable, 0) for variable in variables)
+
+#Monomial orderings, each turning the exponents of a monomial over its variables in alphabetical order into a key that sorts the larger monomial last
+MONOMIAL_ORDERS = {
+    'lex': lambda exponents: exponents,
+    'grlex': lambda exponents: (sum(exponents), exponents),
+    'grevlex': lambda exponents: (sum(exponents), tuple(-exponent for exponent in reversed(exponents)))
+}
+
+#Get a function that gives the sort key of a monomial key in one of the orderings
+def _order_key(order:str, variables:list):
+    orderKey = MONOMIAL_ORDERS[order]
+    return lambda key: orderKey(_exponents(key, variables))
+
+#Divide one monomial by another, returning None if it is not divisible
+def _divide_monomials(dividend:tuple, divisor:tuple) -> Union[tuple, None]:
+    exponents = dict(dividend)
+    for variable, exponent in divisor:
+        if exponents.get(variable, 0) < exponent:
+            return None
+        exponents[variable] = exponents.get(variable, 0) - exponent
+
+    return tuple(sorted(pair for pair in exponents.items() if pair[1] != 0))
+
+#Divide one coefficient by another exactly, giving an int if it divides evenly and a fraction otherwise, and only a float if either is a float
+def _divide_coefficients(value, divisor):
+    if type(value) is int and type(divisor) is int:
+        if value % divisor == 0:
+            return value // divisor
+        else:
+            return FrozenFraction([value, divisor])
+
+    return value / divisor
+
+#The types that a polynomial can be multiplied by directly
+SCALAR_TYPES = (int, float, Fraction, FrozenFraction)
+
 class Polynomial:
-    def __init__(self, polynomial:Union[list, str]):
+    #The terms are kept in a dict from the key of each monomial to its coefficient, so like terms are found in O(1)
+    #Like terms are always merged and zero terms dropped, so the dict is a normal form that equality and hashing can use directly
+    #The order is the monomial ordering that terms are listed, printed and divided in, from the largest monomial down
+    order = 'grlex'
+
+    def __init__(self, polynomial:Union[list, str], order:str='grlex'):
         #print(f'the polynomials are {polynomial} and are of type {type(polynomial).__name__}') #debug
+        if order not in MONOMIAL_ORDERS:
+            raise ValueError(f'unknown monomial ordering {order!r}, expected one of {", ".join(MONOMIAL_ORDERS)}')
+
         if type(polynomial) is list:
-            for term in polynomial:
-                if not 'num' in term:
-                    raise KeyError('Every term must contain key \'num\'')
-            self.polynomial = polynomial
+            self._terms = self._list_to_terms(polynomial)
         else:
-            self.polynomial = self._parse(polynomial, get_variables(polynomial))
+            self._terms = _parse_terms(polynomial)
+        self.order = order
         #print(self.polynomial) #debug
 
-    def _parse(self, polynomial:str, variables:list) -> list:
-        #parse the polynomial into a list of dictionaries
-        
-        #print(f'parsing polynomial {polynomial}') #debug
-        output = []
-        negatives = []
-        additions = re.finditer(r'\s+[+-]\s+', polynomial)
-        startNegative = re.search(r'^-', polynomial)
-        if startNegative:
-            negatives.append(0)
-            polynomial = polynomial[1:]
-
-        for i, match in enumerate(additions):
-            #print(f'the match at position {i} is {match.group()}') #debug
-            if match.group() == ' - ':
-                negatives.append(i + 1)
-
-        terms = re.split(r'\s+[+-]\s+', polynomial)
-        #print(f'the terms before translation are {terms}') #debug
-        terms = [self._translate_super(i) for i in terms]
-        #print(f'the terms after translation are {terms}') #debug
-        #print(f'the negatives are {negatives}') #debug
-
-        for i, term in enumerate(terms):
-            term = term.strip()
-            #print(f'parsing term {term} at position {i}') #debug
-            
-            currentTerm = {}
-                
-            #Check if term should be negative
-            if i in negatives:
-                negativeMultiple = -1
-            else:
-                negativeMultiple = 1
-                        
-            for variable in get_variables(term):
-                if f'{variable}^' in term:
-                    currentTerm[variable] = self._trim_num(term, 'right')
-                            
-                else: #If it has no exponent
-                    currentTerm[variable] = 1
-
-            trimmed = self._trim_num(term, 'left')
-            if trimmed: #If there is a coefficient
-                currentTerm['num'] = trimmed * negativeMultiple
-            else:
-                currentTerm['num'] = negativeMultiple
+    #Parse many strings, returning the polynomials and a list of (index, string, error message) for rows that failed
+    @classmethod
+    def parse_many(cls, strings:Iterable, start:int=0) -> tuple:
+        polynomials = []
+        errors = []
+        for i, string in enumerate(strings, start):
+            try:
+                polynomials.append(cls._from_terms(_parse_terms(string)))
+            except ValueError as error:
+                errors.append((i, string, str(error)))
+
+        return polynomials, errors
+
+    #Create a polynomial directly from a dict of monomial keys and coefficients without zeros, which it takes ownership of
+    @classmethod
+    def _from_terms(cls, terms:dict, order:str='grlex'):
+        output = object.__new__(cls)
+        output._terms = terms
+        output.order = order
+        return output
 
-            if currentTerm:
-                output.append(currentTerm)
+    #Create a polynomial from a dict of terms, in the same ordering as this one
+    def _new(self, terms:dict):
+        return Polynomial._from_terms(terms, self.order)
 
-        return output
+    #Get the (key, coefficient) pairs of the terms, from the largest monomial down in the given ordering
+    def _sorted_terms(self, order:str) -> list:
+        orderKey = _order_key(order, self._variables())
+        return sorted(self._terms.items(), key=lambda item: orderKey(item[0]), reverse=True)
+
+    #Get a copy with its terms stored from the largest monomial down in the given ordering, which it keeps for printing and division
+    def normalize(self, order:Union[str, None]=None):
+        if order is None:
+            order = self.order
+        elif order not in MONOMIAL_ORDERS:
+            raise ValueError(f'unknown monomial ordering {order!r}, expected one of {", ".join(MONOMIAL_ORDERS)}')
+
+        return Polynomial._from_terms(dict(self._sorted_terms(order)), order)
+
+    def _list_to_terms(self, polynomial:list) -> dict:
+        terms = {}
+        for term in polynomial:
+            if not 'num' in term:
+                raise KeyError('Every term must contain key \'num\'')
+
+            _add_term(terms, _monomial(term), term['num'])
+
+        return terms
+
+    #The terms as a list of dicts from each variable to its exponent, with the coefficient under 'num'
+    @property
+    def polynomial(self) -> list:
+        return [{**dict(key), 'num': coefficient} for key, coefficient in self._sorted_terms(self.order)]
+
+    @polynomial.setter
+    def polynomial(self, polynomial:list) -> None:
+        self._terms = self._list_to_terms(polynomial)
+
+    def _variables(self) -> list:
+        return sorted({variable for key in self._terms for variable, exponent in key})
 
     def differentiate(self, varToDiff:str=None):
         if varToDiff is None:
-            #print(f'attempting to imply variable from polnomial with variables {self.get_variables(self.polynomial)}') #debug
-            if len(self.get_variables(self.polynomial)) != 1:
+            #print(f'attempting to imply variable from polnomial with variables {self._variables()}') #debug
+            if len(self._variables()) != 1:
                 raise TypeError('cannot implicitly detect variable for polynomials of multiple variables')
             else:
-                varToDiff = self.get_variables(self.polynomial)[0]
-        
-        outputPolynomial = []
-        for term in self.polynomial:
-            termToEdit = {}
-            edited = False
-            for variable, exponent in term.items():
-                if variable == varToDiff:
-                    termToEdit['num'] = term['num'] * exponent
-                    if exponent - 1 != 0:
-                        termToEdit[variable] = exponent - 1
-                    edited = True
-                elif variable != 'num':
-                    termToEdit[variable] = exponent
-            if not edited:
+                varToDiff = self._variables()[0]
+
+        outputTerms = {}
+        for key, coefficient in self._terms.items():
+            exponent = dict(key).get(varToDiff)
+            if exponent is None:
                 continue
 
-            outputPolynomial.append(termToEdit)
+            _add_term(outputTerms, _with_exponent(key, varToDiff, exponent - 1), coefficient * exponent)
 
-        return Polynomial(outputPolynomial)
+        return self._new(outputTerms)
 
     def integrate(self, varToIntegrate:str=None):
         if varToIntegrate is None:
-            if len(get_variables(self.polynomial)) != 1:
+            if len(self._variables()) != 1:
                 raise TypeError('cannot implicitly detect variable for polynomials of multiple variables')
             else:
-                varToIntegrate = get_variables(self.polynomial)[0]
-                
-        outputPolynomial = []
-        for term in self.polynomial:
-            termToEdit = {}
-            edited = False
-            for variable, exponent in term.items():
-                if variable == varToIntegrate:
-                    termToEdit['num'] = term['num'] / (exponent + 1)
-                    termToEdit[variable] = exponent + 1
-                    edited = True
-                elif variable != 'num':
-                    termToEdit[variable] = exponent
-            if not edited:
-                termToEdit['num'] = term['num']
-                termToEdit[varToIntegrate] = 1
-
-            outputPolynomial.append(termToEdit)
-
-        return Polynomial(outputPolynomial)
+                varToIntegrate = self._variables()[0]
+
+        outputTerms = {}
+        for key, coefficient in self._terms.items():
+            exponent = dict(key).get(varToIntegrate, 0)
+            if exponent:
+                coefficient = coefficient / (exponent + 1)
+
+            _add_term(outputTerms, _with_exponent(key, varToIntegrate, exponent + 1), coefficient)
+
+        return self._new(outputTerms)
+
+    #Substitute a value for one variable in every term
+    def _substitute(self, variable:str, value) -> dict:
+        terms = {}
+        for key, coefficient in self._terms.items():
+            exponent = dict(key).get(variable)
+            if exponent is None:
+                _add_term(terms, key, coefficient)
+            else:
+                _add_term(terms, _with_exponent(key, variable, 0), coefficient * value ** exponent)
+
+        return terms
 
     def integrate_definite(self, varToIntegrate:str, max:int, min:int):
         integrated = self.integrate(varToIntegrate)
-        outputs = [[], []]
-        limits = [max, min]
 
-        for i, output in enumerate(outputs):
-            for term in integrated.polynomial:
-                outputTerm = {}
-                edited = False
-                for variable, exponent in term.items():
-                    if variable == varToIntegrate:
-                        outputTerm['num'] = term['num'] * limits[i] ** exponent
-                        edited = True
-                    elif variable != 'num':
-                        outputTerm[variable] = exponent
+        upper = self._new(integrated._substitute(varToIntegrate, max))
+        lower = self._new(integrated._substitute(varToIntegrate, min))
 
-                if not edited:
-                    outputTerm['num'] = term['num']
+        return upper - lower
 
-                output.append(outputTerm)
+    #Get the value of the polynomial with a value, or a NumPy array of values, for every variable
+    def evaluate(self, **values):
+        return self.compile()(**values)
 
-            #print(f'output {i} before cleanup is {output}') #debug
-            output = self._consolidate(output)
-            #print(f'output {i} after cleanup is {output}') #debug
+    #Get a function that evaluates the polynomial, to avoid preparing it again for each set of values
+    def compile(self):
+        return CompiledPolynomial(self)
 
-        upper = Polynomial(outputs[0])
-        lower = Polynomial(outputs[1])
+    #Add or subtract the terms of another polynomial into a dict of terms
+    def _combine(self, terms:dict, other, subtract:bool) -> dict:
+        for key, coefficient in other._terms.items():
+            _add_term(terms, key, -coefficient if subtract else coefficient)
 
-        return upper - lower
+        return terms
 
     def __add__(self, other):
         #print(f'adding polynomials {self} and {other}') #debug
-        outputPolynomial = deepcopy(self.polynomial)
-        
-        for i, term in enumerate(deepcopy(other.polynomial)):
-            #print(f'adding term {term} to polynomial {outputPolynomial}') #debug
-            location = self._locate(outputPolynomial.copy(), term.copy())
-            if not type(location) is bool:
-                outputPolynomial[location]['num'] += term['num']
-            else:
-                outputPolynomial.append(term.copy())
-
-        #print(f'finished polynomial is {self.consolidate(outputPolynomial)}') #debug
-        return Polynomial(self._consolidate(outputPolynomial))
+        return self._new(self._combine(self._terms.copy(), other, False))
 
     def __sub__(self, other):
         #print(f'subtracting polynomial {other} from {self}') #debug
-        outputPolynomial = deepcopy(self.polynomial)
-        
-        for i, term in enumerate(deepcopy(other.polynomial)):
-            #print(f'subtracting term {term} from polynomial {outputPolynomial}') #debug
-            location = self._locate(outputPolynomial.copy(), term.copy())
-            if not type(location) is bool:
-                outputPolynomial[location]['num'] -= term['num']
-            else:
-                currentTerm = {}
-                for variable, exponent in term.items():
-                    if variable == 'num':
-                        currentTerm['num'] = -exponent
-                    else:
-                        currentTerm[variable] = exponent
-                outputPolynomial.append(currentTerm)
-
-        #print(f'finished polynomial is {self.consolidate(outputPolynomial)}') #debug
-        return Polynomial(self.consolidate(outputPolynomial))
+        return self._new(self._combine(self._terms.copy(), other, True))
 
     def __iadd__(self, other):
         #print(f'adding polynomials {self} and {other}') #debug
-        outputPolynomial = deepcopy(self.polynomial)
-        
-        for i, term in enumerate(deepcopy(other.polynomial)):
-            #print(f'adding term {term} to polynomial {outputPolynomial}') #debug
-            location = self._locate(outputPolynomial.copy(), term.copy())
-            if not type(location) is bool:
-                outputPolynomial[location]['num'] += term['num']
-            else:
-                outputPolynomial.append(term.copy())
-
-        #print(f'finished polynomial is {self.consolidate(outputPolynomial)}') #debug
-        self.polynomial = self.consolidate(outputPolynomial)
+        self._combine(self._terms, other, False)
         return self
 
     def __isub__(self, other):
         #print(f'subtracting polynomial {other} from {self}') #debug
-        outputPolynomial = deepcopy(self.polynomial)
-        
-        for i, term in enumerate(deepcopy(other.polynomial)):
-            #print(f'suntracting term {term} from polynomial {outputPolynomial}') #debug
-            location = self._locate(outputPolynomial.copy(), term.copy())
-            if not type(location) is bool:
-                outputPolynomial[location]['num'] -= term['num']
-            else:
-                currentTerm = {}
-                for variable, exponent in term.items():
-                    if variable == 'num':
-                        currentTerm['num'] = -exponent
-                    else:
-                        currentTerm[variable] = exponent
-                outputPolynomial.append(currentTerm)
-
-        #print(f'finished polynomial is {self.consolidate(outputPolynomial)}') #debug
-        self.polynomial = self.consolidate(outputPolynomial)
+        self._combine(self._terms, other, True)
         return self
 
+    #Whether every exponent is a positive int, as keys leave out exponents of zero
+    def _natural_exponents(self) -> bool:
+        return all(_is_natural(exponent) for key in self._terms for variable, exponent in key)
+
+    #Get the variable of a polynomial with only one, or None
+    def _single_variable(self) -> Union[str, None]:
+        variables = self._variables()
+        return variables[0] if len(variables) == 1 else None
+
+    #Get the variable and coefficient lists of two polynomials in at most one shared variable, or None if they are not both of that form
+    def _dense_pair(self, other, minDensity:float=0) -> Union[tuple, None]:
+        variables = sorted(set(self._variables()) | set(other._variables()))
+        if len(variables) > 1:
+            return None
+
+        variable = variables[0] if variables else None
+        first = _dense(self._terms, variable, minDensity)
+        second = _dense(other._terms, variable, minDensity)
+        if first is None or second is None:
+            return None
+
+        return variable, first, second
+
+    def _scale(self, scalar) -> dict:
+        return {key: coefficient * scalar for key, coefficient in self._terms.items() if coefficient * scalar}
+
+    #Multiply term by term, which suits sparse polynomials and those of several variables
+    def _multiply_sparse(self, other) -> dict:
+        terms = {}
+        for key1, coefficient1 in self._terms.items():
+            for key2, coefficient2 in other._terms.items():
+                _add_term(terms, _multiply_monomials(key1, key2), coefficient1 * coefficient2)
+
+        return terms
+
+    def __mul__(self, other):
+        if type(other) in SCALAR_TYPES:
+            return self._new(self._scale(other))
+        if type(other) is not Polynomial:
+            return NotImplemented
+
+        #Dense multiplication only pays off for long polynomials that are mostly filled in
+        if min(len(self._terms), len(other._terms)) >= DENSE_MIN_TERMS:
+            dense = self._dense_pair(other, DENSE_MIN_DENSITY)
+            if dense is not None:
+                variable, first, second = dense
+                return self._new(_from_dense(_multiply_dense(first, second), variable))
+
+        return self._new(self._multiply_sparse(other))
+
+    def __rmul__(self, other):
+        if type(other) in SCALAR_TYPES:
+            return self._new(self._scale(other))
+
+        return NotImplemented
+
+    #Raise to a non-negative int power by repeated squaring
+    def __pow__(self, power:int):
+        if type(power) is not int:
+            return NotImplemented
+        if power < 0:
+            raise ValueError('cannot raise polynomial to a negative power')
+
+        output = self._new({(): 1})
+        base = self
+        while power:
+            if power & 1:
+                output = output * base
+            power >>= 1
+            if power:
+                base = base * base
+
+        return output
+
+    #Long division of coefficient lists, returning the quotient and remainder lists
+    #The leading coefficient of each step cancels by construction, so it is never subtracted and left to rounding
+    def _divmod_dense(self, dividend:list, divisor:list) -> tuple:
+        remainder = dividend.copy()
+        quotient = [0] * max(len(dividend) - len(divisor) + 1, 0)
+        lead = divisor[-1]
+        for i in range(len(quotient) - 1, -1, -1):
+            coefficient = _divide_coefficients(remainder[i + len(divisor) - 1], lead)
+            quotient[i] = coefficient
+            if coefficient:
+                for j in range(len(divisor) - 1):
+                    remainder[i + j] = remainder[i + j] - coefficient * divisor[j]
+
+        return quotient, remainder[:len(divisor) - 1]
+
+    #Divide by repeatedly cancelling the leading term, in this polynomial's monomial ordering, which handles several variables
+    def _divmod_sparse(self, other) -> tuple:
+        orderKey = _order_key(self.order, sorted(set(self._variables()) | set(other._variables())))
+        divisorKey = max(other._terms, key=orderKey)
+        divisorLead = other._terms[divisorKey]
+
+        terms = self._terms.copy()
+        quotient = {}
+        remainder = {}
+        while terms:
+            key = max(terms, key=orderKey)
+            coefficient = terms[key]
+            factor = _divide_monomials(key, divisorKey)
+            if factor is None:
+                remainder[key] = terms.pop(key)
+                continue
+
+            scale = _divide_coefficients(coefficient, divisorLead)
+            _add_term(quotient, factor, scale)
+            #The leading term cancels by construction, like in _divmod_dense
+            del terms[key]
+            for otherKey, otherCoefficient in other._terms.items():
+                if otherKey != divisorKey:
+                    _add_term(terms, _multiply_monomials(factor, otherKey), -scale * otherCoefficient)
+
+        return quotient, remainder
+
+    def __divmod__(self, other):
+        if type(other) is not Polynomial:
+            return NotImplemented
+        if not other._terms:
+            raise ZeroDivisionError('polynomial division by zero')
+        #With negative or fractional exponents there is no lowest monomial, so long division would never finish
+        if not (self._natural_exponents() and other._natural_exponents()):
+            raise ValueError('cannot divide polynomials with exponents that are not non-negative ints')
+
+        dense = other._dense_pair(self)
+        if dense is not None:
+            variable, second, first = dense
+            while first and not first[-1]:
+                first.pop()
+
+            quotient, remainder = self._divmod_dense(first, second)
+            return self._new(_from_dense(quotient, variable)), self._new(_from_dense(remainder, variable))
+
+        quotient, remainder = self._divmod_sparse(other)
+        return self._new(quotient), self._new(remainder)
+
+    def __floordiv__(self, other):
+        result = self.__divmod__(other)
+        return result if result is NotImplemented else result[0]
+
+    def __mod__(self, other):
+        result = self.__divmod__(other)
+        return result if result is NotImplemented else result[1]
+
     def __str__(self):
+        if not self._terms:
+            return '0'
+
         output = ''
 
         i = 0
-        for term in self.polynomial:
-            if term['num'] < 0:
-                if term['num'] != -1:
+        for key, num in self._sorted_terms(self.order):
+            if num < 0:
+                if num != -1 or not key:
                     if i == 0:
-                        output += f'-{self._int_if_pos(abs(term["num"]))}'
+                        output += f'-{self._int_if_pos(abs(num))}'
                     else:
-                        output += f' - {self._int_if_pos(abs(term["num"]))}'
+                        output += f' - {self._int_if_pos(abs(num))}'
                 else:
                     if i == 0:
                         output += '-'
                     else:
-                        output += ' + '
+                        output += ' - '
             elif i != 0:
-                if term['num'] == 1:
+                if num == 1 and key:
                     output += ' + '
                 else:
-                    output += f' + {self._int_if_pos(term["num"])}'
-            elif term['num'] != 1:
-                output += str(self._int_if_pos(term['num']))
+                    output += f' + {self._int_if_pos(num)}'
+            elif num != 1 or not key:
+                output += str(self._int_if_pos(num))
 
             i += 1
-                
-            for variable, exponent in term.items():
-                if variable != 'num':
-                    if exponent == 1:
-                        output += str(variable)
-                    else:
-                        output += variable + self._super(self._int_if_pos(exponent))
-                
+
+            for variable, exponent in key:
+                if exponent == 1:
+                    output += str(variable)
+                else:
+                    output += variable + self._super(self._int_if_pos(exponent))
+
         return output
 
     def __repr__(self):
-        return f'polynomial.Polynomial({self.polynomial})'
+        if self.order == 'grlex':
+            return f'polynomial.Polynomial({self.polynomial})'
+        else:
+            return f'polynomial.Polynomial({self.polynomial}, order={self.order!r})'
 
     def __float__(self):
-        temp = self.polynomial[0].copy()
-        del temp['num']
-        
-        if len(self.polynomial) == 1 and not temp:
-            return float(self.polynomial[0]['num'])
+        if all(not key for key in self._terms):
+            return float(self._terms.get((), 0))
         else:
             raise ValueError('cannot convert polynomial with variables to float')
 
@@ -297,30 +644,21 @@ class Polynomial:
             raise ValueError('cannot convert polynomial with variables to int')
 
     def __getitem__(self, variable):
-        output = []
-        
-        for term in self.polynomial:
-            if variable in term:
-                output.append(term.copy())
-
-        return Polynomial(output)
+        return self._new({
+            key: coefficient for key, coefficient in self._terms.items()
+            if any(pair[0] == variable for pair in key)
+        })
 
+    #The terms are in normal form, so two polynomials are equal when their dicts are, which takes one lookup per term whatever the ordering
     def __eq__(self, other):
-        equal = True
-
-        for term in self.polynomial:
-            #print(f'comparing term {term} from self') #debug
-            if term not in other.polynomial:
-                #print(f'didn\'t find term {term} in other') #debug
-                equal = False
-                
-        for term in other.polynomial:
-            #print(f'comparing term {term} from other') #debug
-            if term not in self.polynomial:
-                #print(f'didn\'t find term {term} in self') #debug
-                equal = False
-
-        return equal
+        if type(other) is not Polynomial:
+            return NotImplemented
+
+        return self._terms == other._terms
+
+    #The hash is of the current terms, so a polynomial must not be changed in place while it is in a set or used as a dict key
+    def __hash__(self):
+        return hash(frozenset(self._terms.items()))
 
     def _int_if_pos(self, num:Union[float, str]) -> Union[int, float, str]:
         #print(f'checking if {num} can be int') #debug
@@ -333,93 +671,124 @@ class Polynomial:
         else:
             return int(num)
 
-    def _trim_num(self, string:str, side:str) -> float:
-        #print(f'trimming {string}') #debug
-        numPos = self._get_num_pos(string, side)
-
-        if numPos:
-            #print(f'num found between positions {numPos.start()} and {numPos.end()}') #debug
-            return float(string[numPos[0]:numPos[1]])
+    #Write an exponent in superscript, or after ^ if it is not an int
+    def _super(self, num:Union[int, float]) -> str:
+        if type(num) is int:
+            return str(num).translate(_TO_SUPERSCRIPT)
         else:
-            #print(f'num not found') #debug
-            return 0.0
-
-    def _get_num_pos(self, string:str, side:str) -> Union[list, None]:
-        if side == 'left':
-            numPos = re.search(r'^-?\d+\.?\d*', string)
+            return f'^{num}'
+
+#Raise to a positive int power, without a call to pow for the most common case
+def _power(value, exponent:int):
+    return value if exponent == 1 else value ** exponent
+
+#Whether an exponent is a positive int, so that its power can be built up by multiplication
+def _is_natural(exponent) -> bool:
+    return exponent > 0 and exponent == int(exponent)
+
+class CompiledPolynomial:
+    #A polynomial prepared for evaluation at many points, created by Polynomial.compile
+    #A polynomial in one variable is evaluated by Horner's scheme, and any other from a table of the powers of each variable
+    #Any value can be a NumPy array, in which case the polynomial is evaluated at every element in one vectorised pass
+    def __init__(self, polynomial:Polynomial):
+        terms = {key: coefficient for key, coefficient in polynomial._terms.items() if coefficient}
+        self.variables = polynomial._variables()
+
+        if len(self.variables) == 1 and all(_is_natural(key[0][1]) for key in terms if key):
+            #Pairs of exponent and coefficient, from the highest exponent down
+            self._horner = sorted(((int(key[0][1]) if key else 0, coefficient) for key, coefficient in terms.items()), key=lambda pair: -pair[0])
+            self._terms = None
         else:
-            numPos = re.search(r'-?\d+\.?\d*$', string)
-
-        if numPos:
-            return [numPos.start(), numPos.end()]
-        else:
-            return None
-
-    def _locate(self, polynomial:list, searchTerm:dict) -> Union[int, bool]:
-        #print(f'locating term {searchTerm} in polynomial {polynomial}') #debug
-        del searchTerm['num']
-        for i, term in enumerate(polynomial):
-            termToEdit = term.copy()
-            del termToEdit['num']
-            if searchTerm == termToEdit:
-                #print(f'found term at position {i}') #debug
-                return i
-        #print('didn\'t find term') #debug
-        return False
-
-    def _consolidate(self, polynomial:list) -> list:
-        output = polynomial.copy()
-        termsToRemove = []
-        
-        total = 0
-        for term in output:
-            numVars = 0
-            for variable in term:
-                if variable != 'num':
-                    numVars += 1
-
-            if numVars == 0:
-                total += term['num']
-                termsToRemove.append(term)
-
-        if total:
-            output.append({'num': total})
-
-        for term in termsToRemove:
-            del output[output.index(term)]
+            self._horner = None
+            #Each key is changed to pairs of the index of a variable and an exponent
+            self._terms = [(tuple((self.variables.index(variable), exponent) for variable, exponent in key), coefficient) for key, coefficient in terms.items()]
+            self._exponents = [sorted({exponent for key, coefficient in self._terms for index, exponent in key if index == i}) for i in range(len(self.variables))]
+
+    #Get the values of the variables in order, from positional values in the order of self.variables and keyword values
+    def _values(self, args:tuple, values:dict) -> list:
+        if len(args) > len(self.variables):
+            raise TypeError(f'expected at most {len(self.variables)} values, got {len(args)}')
+
+        for variable in values:
+            if variable not in self.variables:
+                raise TypeError(f'unexpected variable \'{variable}\'')
+            if self.variables.index(variable) < len(args):
+                raise TypeError(f'got multiple values for variable \'{variable}\'')
+
+        output = list(args)
+        for variable in self.variables[len(args):]:
+            if variable not in values:
+                raise TypeError(f'missing value for variable \'{variable}\'')
+            output.append(values[variable])
 
         return output
 
-    def _super(self, num:str) -> str:
-        superscriptMap = {'1': '¹', '2': '²', '3': '³', '4': '⁴', '5': '⁵', '6': '⁶', '7': '⁷', '8': '⁸', '9': '⁹', '-': '⁻'}
+    def __call__(self, *args, **values):
+        values = self._values(args, values)
+        isArray = np is not None and any(type(value) is np.ndarray for value in values)
+        #Int arrays are evaluated as floats, since NumPy ints wrap around on overflow and cannot be raised to negative powers
+        if isArray:
+            values = [value.astype(np.float64) if type(value) is np.ndarray and value.dtype.kind in 'biu' else value for value in values]
+
+        if self._horner is not None:
+            result = self._evaluate_horner(values[0], isArray)
+        else:
+            result = self._evaluate_table(values, isArray)
+
+        #The result is broadcast against every array, so that it has their shape even if it does not use all of them
+        if isArray:
+            shape = np.broadcast(*values).shape
+            if type(result) is not np.ndarray or result.shape != shape:
+                result = result + np.zeros(shape)
+
+        return result
+
+    #Coefficients are used as floats with arrays, since NumPy cannot multiply its arrays by fractions
+    def _coefficient(self, coefficient, isArray:bool):
+        return float(coefficient) if isArray and type(coefficient) not in (int, float) else coefficient
+
+    def _evaluate_horner(self, value, isArray:bool):
+        if not self._horner:
+            return 0
+
+        exponent, result = self._horner[0]
+        result = self._coefficient(result, isArray)
+        for nextExponent, coefficient in self._horner[1:]:
+            result = result * _power(value, exponent - nextExponent) + self._coefficient(coefficient, isArray)
+            exponent = nextExponent
+
+        if exponent:
+            result = result * _power(value, exponent)
+
+        return result
+
+    def _evaluate_table(self, values:list, isArray:bool):
+        #Each power that any term uses is found once, building on the one before it where possible
+        tables = []
+        for value, exponents in zip(values, self._exponents):
+            table = {}
+            power = 1
+            previous = 0
+            for exponent in exponents:
+                if _is_natural(exponent) and (previous == 0 or _is_natural(previous)):
+                    power = power * _power(value, int(exponent - previous))
+                else:
+                    power = value ** exponent
 
-        return self._translate(str(num), superscriptMap)
+                table[exponent] = power
+                previous = exponent
 
-    def _translate_super(self, string:str) -> str:
-        #print(f'translating {string}') #debug
-        superscriptMap = {'1': '¹', '2': '²', '3': '³', '4': '⁴', '5': '⁵', '6': '⁶', '7': '⁷', '8': '⁸', '9': '⁹', '-': '⁻'}
+            tables.append(table)
 
-        superscriptMap = {v:k for (k, v) in superscriptMap.items()}
+        result = 0
+        for key, coefficient in self._terms:
+            term = self._coefficient(coefficient, isArray)
+            for index, exponent in key:
+                term = term * tables[index][exponent]
 
-        string = self._translate(string, superscriptMap)
+            result = result + term
 
-        num = self._trim_num(string, 'right')
-        numPos = self._get_num_pos(string, 'right')
+        return result
 
-        if numPos:
-            if numPos[0] == 0:
-                return string
-            if string[numPos[0] - 1] == '^':
-                return string[:numPos[0]] + str(num)
-            else:
-                return string[:numPos[0]] + '^' + str(num)
-        else:
-            return string
-        
-    def _translate(self, string:str, table:dict) -> str:
-        trans = str.maketrans(
-            ''.join(table.keys()),
-            ''.join(table.values())
-        )
-
-        return string.translate(trans)
\ No newline at end of file
+    def __repr__(self):
+        return f'polynomial.CompiledPolynomial(variables={self.variables})'
@@ -1,67 +1,137 @@
-from typing import Any
+import gc
+import mmap
+import pickle
+import struct
+import sys
+from array import array
+from collections.abc import Iterator
+from contextlib import contextmanager
+from functools import reduce
+from itertools import accumulate, islice
+from operator import add, mul, sub, truediv
+from typing import Any, Iterable, Union
+from KlebLib.fraction import Accumulator, Fraction, FrozenFraction, sum_fractions
+from KlebLib.fractionarray import INT64_MAX, FractionArray, _max_abs
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+#Pause the cyclic garbage collector while many series nodes are created at once
+#Every node is tracked by the collector, so the collections that creating a million of them triggers traverse every live node, which made building and copying large nested series four to seven times slower
+#Nodes only refer forwards, and a head never refers to itself (see Series._set_tail), so the nodes themselves never form a cycle that these collections could free
+#Only the loops that create nodes are paused, and the values are gathered beforehand, so no code of the caller, such as a generator or an item's deepcopy, runs while collection is off
+#The previous state is restored afterwards, so a collector that was already disabled stays disabled
+@contextmanager
+def _paused_collection():
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+#Types whose items are unpacked into a series, along with any iterator
+CONTAINER_TYPES = (list, tuple, set, frozenset, range)
+
+#Create a series from the items of any iterable, even if it is not a container that the series would otherwise unpack
+#Each series class takes this as its from_iterable classmethod
+def _from_iterable(cls, items:Iterable, selfType:type=None, subType:type=None):
+    if type(items) not in CONTAINER_TYPES:
+        items = iter(items)
+
+    return cls(items, selfType, subType)
 
 class Series:
+    #Every node of a series is a Series, so slots keep each one small and quick to create
+    __slots__ = ('value', 'next', 'type', 'subType', '_length', '_tail')
+
     def __init__(self, item:Any, selfType:type=None, subType:type=None):
         #print(f'creating series from item {item}') #debug
-        skip = False
+        self.next = None
 
         if type(item) is selfType:
             #print('using given type') #debug
             self.value = item
             self.type = selfType
-            self.next = None
-            skip = True
-            
-        elif type(item) is set or type(item) is tuple:
-            #print(f'converting item from {type(item)} to list') #debug
-            item = list(item)
+            self._length = 1
+            self._tail = None
+
+        elif type(item) in CONTAINER_TYPES or isinstance(item, Iterator):
+            self._build(item, selfType)
             
-        elif type(item) is not list:
+        else:
             if selfType and type(item) is not selfType:
                 raise TypeError(f'type of given item {item} is not the same as given type {selfType}')
                 
             self.value = item
             self.type = type(item)
-            self.next = None
-            
-        if (type(item) is list) and (not skip):
-            if selfType and type(item[0]) is not selfType:
-                raise TypeError(f'type of given item {item[0]} is not the same as given type {selfType}')
-                
-            for subItem in item:
-                if type(subItem) is not type(item[0]):
+            self._length = 1
+            self._tail = None
+
+        #The items are only checked against the subtype here, and after that only the items that are added
+        self.subType = _check_subtype(SeriesIterator(self), selfType, subType)
+
+    from_iterable = classmethod(_from_iterable)
+
+    #Build the nodes of this series from the items of an iterable in a single pass
+    def _build(self, items:Iterable, selfType:type) -> None:
+        items = iter(items)
+        try:
+            first = next(items)
+        except StopIteration:
+            raise IndexError('cannot create series from empty container') from None
+
+        firstType = type(first)
+        if selfType and firstType is not selfType:
+            raise TypeError(f'type of given item {first} is not the same as given type {selfType}')
+
+        self.type = firstType
+        self.value = first
+
+        #Items are taken from the iterator before collection is paused
+        items = list(items)
+        last = self
+        count = 1
+        newNode = object.__new__
+        with _paused_collection():
+            for item in items:
+                if type(item) is not firstType:
                     raise TypeError('container passed to series must be of uniform type')
-                    
-            self.type = type(item[0])
-            self.value = item[0]
-            if len(item) > 1:
-                self.next = Series(item[1:])
-            else:
-                self.next = None
 
-        if subType is not None:
-            if selfType is not Series:
-                raise TypeError('series type must be series if subtype is given')
+                node = newNode(Series)
+                node.value = item
+                node.type = firstType
+                node.next = None
+                node.subType = None
+                node._length = None
+                node._tail = None
 
-            self.subType = subType
-            for series in self:
-                if series.type != subType:
-                    raise TypeError(f'series type {series.type} must be equal to subtype {subType}')
-        else:
-            self.subType = None
+                last.next = node
+                last = node
+                count += 1
+
+        self._length = count
+        self._set_tail(last)
 
+    #Only the head of a series keeps its length, and any other node always holds an item
     def __len__(self):
-        if self.value is not None:
-            length = 1
-            current = self
-            while current.next is not None:
-                length += 1
-                current = current.next
-
-            return length
-            
-        else:
-            return 0
+        if self._length is not None:
+            return self._length
+
+        length = 1
+        current = self
+        while current.next is not None:
+            length += 1
+            current = current.next
+
+        return length
+
+    #Whether this series has no items, which its head marks with a length of zero, as None is a valid item
+    def _is_empty(self) -> bool:
+        return self._length == 0
 
     @property
     def objects(self):
@@ -76,59 +146,333 @@ class Series:
         #print('got objects') #debug
         return result
 
-    def __getitem__(self, index:int):
-        if index >= len(self) or -index > len(self):
-            raise IndexError('series index out of range')
+    #Get the last node, which the head of a series keeps a reference to, unless the head is the last node
+    def _last(self):
+        if self._tail is not None:
+            return self._tail
+
+        current = self
+        while current.next is not None:
+            current = current.next
 
-        return self.objects[index].value
+        return current
 
-    def __setitem__(self, index:int, value):
-        if index >= len(self) or -index > len(self):
+    #Keep a reference to the last node on the head, leaving it out if the head is the last node so that the head never refers to itself
+    def _set_tail(self, node) -> None:
+        self._tail = None if node is self else node
+
+    #Get the node at an index in a single traversal
+    def _node(self, index:int):
+        length = len(self)
+        if index < 0:
+            index += length
+        if index < 0 or index >= length:
             raise IndexError('series index out of range')
 
-        self.objects[index].value = value
+        if index == length - 1:
+            return self._last()
+
+        current = self
+        for i in range(index):
+            current = current.next
+
+        return current
+
+    #Create a node that is not the head of a series
+    def _new_node(self, value):
+        node = object.__new__(Series)
+        node.value = value
+        node.type = self.type
+        node.next = None
+        node.subType = None
+        node._length = None
+        node._tail = None
+        return node
+
+    #Build a chain of new nodes from some values, returning the first node, the last node and the number of nodes
+    def _chain(self, values) -> tuple:
+        #Values are taken from the iterable before collection is paused
+        if type(values) is not list:
+            values = list(values)
+
+        first = None
+        last = None
+        count = 0
+        with _paused_collection():
+            for value in values:
+                node = self._new_node(value)
+                if first is None:
+                    first = node
+                else:
+                    last.next = node
+
+                last = node
+                count += 1
+
+        return first, last, count
+
+    #Link a chain of nodes that nothing else refers to onto the end of this series
+    def _link(self, first, last, count:int) -> None:
+        if first is None:
+            return
+
+        if self._is_empty():
+            #This series is empty, so the head takes the place of the first node
+            self.value = first.value
+            self.next = first.next
+            if first is last:
+                last = self
+        else:
+            self._last().next = first
+
+        if self._length is not None:
+            self._length += count
+            self._set_tail(last)
+
+    #Link a series that nothing else refers to onto the end of this one
+    def _adopt(self, series) -> None:
+        #An empty series has no nodes, only a head with no value, so there is nothing to link
+        if series._is_empty():
+            return
+
+        last = series._last()
+        count = len(series)
+        series._length = None
+        series._tail = None
+        self._link(series, last, count)
+
+    #Create an empty series with the same type and subtype as this one
+    def _empty(self):
+        output = object.__new__(Series)
+        output.value = None
+        output.type = self.type
+        output.next = None
+        output.subType = self.subType
+        output._length = 0
+        output._tail = None
+        return output
+
+    #Check the type, and the subtype if there is one, of each item as it is taken from an iterable
+    def _checked(self, items:Iterable):
+        for item in items:
+            _check_item(self, item)
+            yield item
+
+    #Get the positions that a slice covers, in ascending order
+    def _slice_positions(self, index:slice) -> range:
+        positions = range(*index.indices(len(self)))
+        return positions if positions.step > 0 else positions[::-1]
+
+    def __getitem__(self, index:Union[int, slice]):
+        if type(index) is not slice:
+            return self._node(index).value
+
+        positions = self._slice_positions(index)
+        output = self._empty()
+        if not positions:
+            return output
+
+        #Collect every value between the first and last positions in one traversal, then step through them
+        values = []
+        current = self._node(positions[0])
+        for i in range(positions[-1] - positions[0] + 1):
+            values.append(current.value)
+            current = current.next
+
+        values = values[::positions.step]
+        if index.step is not None and index.step < 0:
+            values.reverse()
+
+        output._link(*output._chain(values))
+        return output
+
+    def __setitem__(self, index:Union[int, slice], value):
+        if type(index) is not slice:
+            _check_item(self, value)
+            self._node(index).value = value
+            return
+
+        values = list(self._checked(value))
+        positions = self._slice_positions(index)
+        if index.step is None or index.step == 1:
+            #Replace the slice, which can change the length of the series
+            start = index.indices(len(self))[0]
+            del self[index]
+            self._splice(start, *self._chain(values))
+            return
+
+        if len(values) != len(positions):
+            raise ValueError(f'attempt to assign sequence of size {len(values)} to extended slice of size {len(positions)}')
+        if not positions:
+            return
+
+        if index.step < 0:
+            values.reverse()
+
+        current = self._node(positions[0])
+        for i, value in enumerate(values):
+            current.value = value
+            if i < len(values) - 1:
+                for j in range(positions.step):
+                    current = current.next
+
+    def __delitem__(self, index:Union[int, slice]):
+        if type(index) is slice:
+            self._delete_positions(self._slice_positions(index))
+        else:
+            self._pop(index)
+
+    #Remove the nodes at some ascending positions, stopping the traversal after the last one
+    def _delete_positions(self, positions:range) -> None:
+        if not positions:
+            return
+
+        length = len(self)
+        first = None
+        last = None
+        current = self
+        for i in range(positions[-1] + 1):
+            nextNode = current.next
+            if i not in positions:
+                if last is None:
+                    first = current
+                else:
+                    last.next = current
+                last = current
+
+            current = nextNode
 
-    def __delitem__(self, index):
-        if index >= len(self) or -index > len(self):
+        #current is now the node after the last one removed
+        if last is None:
+            first = current
+        else:
+            last.next = current
+        tail = last if current is None else self._tail
+
+        if first is None:
+            self.value = None
+            self.next = None
+        elif first is not self:
+            #The head cannot be removed, so the first remaining node is merged into it
+            self.value = first.value
+            self.next = first.next
+            if tail is first:
+                tail = self
+
+        if self._length is not None:
+            self._length = length - len(positions)
+            self._set_tail(tail)
+
+    #Remove the node at an index and return its value
+    def _pop(self, index:int):
+        length = len(self)
+        if index < 0:
+            index += length
+        if index < 0 or index >= length:
             raise IndexError('series index out of range')
-            
-        self.objects[index-1].next = self.objects[index+1]
 
-    def insert(self, index, value):
-        temp = self.objects[index]
-        self.objects[index-1].next = Series(value)
-        self.objects[index].next = temp
-        del temp
+        if index == 0:
+            value = self.value
+            removed = self.next
+            if removed is None:
+                self.value = None
+                last = None
+            else:
+                #The head cannot be removed, so the second node is merged into it
+                self.value = removed.value
+                self.next = removed.next
+                last = self if self.next is None else self._tail
+        else:
+            previous = self._node(index - 1)
+            value = previous.next.value
+            previous.next = previous.next.next
+            last = previous if previous.next is None else self._tail
+
+        if self._length is not None:
+            self._length -= 1
+            self._set_tail(last)
+
+        return value
+
+    #Remove an item and return it, by default the last one
+    def pop(self, index:int=-1):
+        return self._pop(index)
+
+    def extend(self, items:Iterable) -> None:
+        self._link(*self._chain(self._checked(items)))
+
+    #Link a chain of new nodes in before the node at an index
+    def _splice(self, index:int, first, last, count:int) -> None:
+        if first is None:
+            return
+
+        length = len(self)
+        if index >= length:
+            self._link(first, last, count)
+            return
+
+        if index == 0:
+            #The head cannot be replaced, so the first new value is put in the head and the old one moved into a new node
+            moved = self._new_node(self.value)
+            moved.next = self.next
+            self.value = first.value
+            if first is last:
+                self.next = moved
+            else:
+                self.next = first.next
+                last.next = moved
+
+            if self._length is not None and self._tail is None:
+                self._tail = moved
+        else:
+            previous = self._node(index - 1)
+            last.next = previous.next
+            previous.next = first
+
+        if self._length is not None:
+            self._length += count
+
+    def insert(self, index:int, value):
+        _check_item(self, value)
+        length = len(self)
+        if index < 0:
+            index = max(index + length, 0)
+
+        node = self._new_node(value)
+        self._splice(index, node, node, 1)
 
     def __iter__(self):
-        self.iterIndex = -1
-        return self
+        return SeriesIterator(self)
 
-    def __next__(self):
-        self.iterIndex += 1
-        if self.iterIndex >= len(self):
-            raise StopIteration
-            
-        return self[self.iterIndex]
+    def __reversed__(self):
+        return SeriesIterator(self, reverse=True)
 
     def __add__(self, other):
         result = self.deepcopy()
 
-        if type(other) is self.type:
-            if result.subType is not None and type(other) is not result.subType:
-                raise TypeError(f'series of type {other.type} cannot be appended to series of subtype {self.subType}')
-                
-            result.objects[-1].next = Series(other, type(other))
+        if _is_item(self, other):
+            _check_item(result, other)
+            node = result._new_node(other)
+            result._link(node, node, 1)
             return result
 
         elif type(other) is list or type(other) is tuple or type(other) is set:
             other = Series(other)
+            owned = True
+
+        else:
+            owned = False
         
-        if type(other) is Series:
+        if type(other) in SERIES_TYPES:
             if self.type != other.type:
                 raise TypeError(f'cannot add series of type {other.type} to series of type {self.type}')
+            _check_added(other, self.subType)
 
-            result.objects[-1].next = other
+            #A series built from a container here can be linked directly, but any other is copied
+            if owned:
+                result._adopt(other)
+            else:
+                result._link(*result._chain(other))
             
         else:
             raise TypeError(f'cannot add object of type {type(other)} to series of type {self.type}')
@@ -136,16 +480,20 @@ class Series:
         return result
 
     def __radd__(self, other):
-        if type(other) is self.type:
-            output = Series(other)
-            output.next = self.deepcopy()
+        if _is_item(self, other):
+            _check_item(self, other)
+            output = Series(other, self.type)
+            output.subType = self.subType
+            output._adopt(self.deepcopy())
             
         elif type(other) is list or type(other) is tuple or type(other) is set:
             output = Series(other)
             if output.type != self.type:
-                raise TypeError(f'cannot add series of type {self.type} to container containing type {other.type}')
+                raise TypeError(f'cannot add series of type {self.type} to container containing type {output.type}')
+            _check_added(output, self.subType)
 
-            output.objects[-1].next = self.deepcopy()
+            output.subType = self.subType
+            output._adopt(self.deepcopy())
             
         else:
             raise IndexError(f'cannot add series of type {self.type} to object of type {type(other)}')
@@ -153,18 +501,28 @@ class Series:
         return output
 
     def __iadd__(self, other):
-        if type(other) is self.type:
-            self.objects[-1].next = Series(other, type(other))
+        if _is_item(self, other):
+            _check_item(self, other)
+            node = self._new_node(other)
+            self._link(node, node, 1)
             return self
         
         elif type(other) is list or type(other) is tuple or type(other) is set:
             other = Series(other)
+            owned = True
+
+        else:
+            owned = False
             
-        if type(other) is Series:
+        if type(other) in SERIES_TYPES:
             if self.type != other.type:
                 raise TypeError(f'cannot add series of type {other.type.__name__} to series of type {self.type.__name__}')
+            _check_added(other, self.subType)
 
-            self.objects[-1].next = other
+            if owned:
+                self._adopt(other)
+            else:
+                self._link(*self._chain(other))
             
         else:
             raise TypeError(f'cannot add object of type {type(other).__name__} to series of type {self.type.__name__}')
@@ -173,23 +531,10 @@ class Series:
 
     def __str__(self):
         #print(f'coverting series with head value {self.value} to str') #debug
-        output = '<'
-        for i, item in enumerate(self):
-            output += str(item)
-            
-            if i != len(self) - 1:
-                output += ', '
-
-        output += '>'
-        return output
+        return '<' + ', '.join(str(item) for item in self) + '>'
 
     def __repr__(self):
-        output = 'series.Series(['
-        for i, item in enumerate(self):
-            output += repr(item)
-            
-            if i != len(self) - 1:
-                output += ', '
+        output = 'series.Series([' + ', '.join(repr(item) for item in self)
 
         if self.type is Series:
             output += f'], series.Series'
@@ -206,36 +551,1266 @@ class Series:
 
         return output
 
+    #Get a copy of this series that stores its items contiguously
+    def compact(self):
+        return CompactSeries(SeriesIterator(self), self.type, self.subType)
+
+    #Get a copy of this series that can be concatenated without copying
+    def persistent(self):
+        return PersistentSeries(SeriesIterator(self), self.type, self.subType)
+
+    #Get a lazy series over the items of this series, for building a pipeline of map, filter, take, chunk and reduce stages
+    def lazy(self):
+        return LazySeries(SeriesIterator(self), self.type, self.subType)
+
+    #Get a copy of this series with elementwise arithmetic and aggregates, for a series of ints, floats or fractions
+    def numeric(self):
+        return NumericSeries(SeriesIterator(self), self.type)
+
     def __list__(self):
         return [item for item in self]
 
     def __set__(self):
         return set(list(self))
 
+    #Copies are built in a single pass, without checking the items again
     def copy(self):
-        output = Series(self[0], self.type, self.subType)
-        current = output
-        for i in range(1, len(self)):
-            current.next = Series(self[i], self.type, self.subType)
+        output = self._empty()
+        output._link(*output._chain(SeriesIterator(self)))
+
+        return output
+
+    def deepcopy(self):
+        output = self._empty()
+        if self._is_empty() or not hasattr(self.value, 'deepcopy'):
+            output._link(*output._chain(SeriesIterator(self)))
+        elif type(self.value) in SERIES_TYPES and self.subType is not None and not hasattr(self.subType, 'deepcopy'):
+            #Series of items with no deepcopy are copied without running any code of the caller, so collection stays paused across all of them rather than for each in turn
+            with _paused_collection():
+                output._link(*output._chain([item.deepcopy() for item in SeriesIterator(self)]))
+        else:
+            output._link(*output._chain(item.deepcopy() for item in SeriesIterator(self)))
+
+        return output
+
+class SeriesIterator:
+    #Walks the nodes of a series, so that each step is O(1) and any number of iterations can run at once
+    def __init__(self, series:Series, reverse:bool=False):
+        if reverse:
+            #A series only links forwards, so the nodes are collected first
+            self._nodes = SeriesIterator(series).nodes()
+            self._current = None
+        else:
+            self._nodes = None
+            self._current = None if series._is_empty() else series
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self._nodes is not None:
+            if not self._nodes:
+                raise StopIteration
+            return self._nodes.pop().value
+
+        current = self._current
+        if current is None:
+            raise StopIteration
+
+        self._current = current.next
+        return current.value
+
+    #Get every remaining node, in order
+    def nodes(self) -> list:
+        result = []
+        current = self._current
+        while current is not None:
+            result.append(current)
             current = current.next
 
+        self._current = None
+        return result
+
+class CompactSeries:
+    #A series that keeps its items in one contiguous list, or an array for ints and floats, with the type stored once
+    def __init__(self, item:Any, selfType:type=None, subType:type=None):
+        values, self.type = _items_and_type(item, selfType)
+        self.values = _pack(self.type, values)
+        self.subType = _check_subtype(self.values, selfType, subType)
+
+    from_iterable = classmethod(_from_iterable)
+
+    def to_series(self) -> Series:
+        return Series(iter(self.values), self.type, self.subType)
+
+    def lazy(self):
+        return LazySeries(iter(self.values), self.type, self.subType)
+
+    def numeric(self):
+        return NumericSeries(iter(self.values), self.type)
+
+    def _check_index(self, index:int) -> None:
+        if index >= len(self.values) or -index > len(self.values):
+            raise IndexError('series index out of range')
+
+    #Switch from an array to a list if a value does not fit in the array
+    def _unpack(self) -> None:
+        self.values = list(self.values)
+
+    def _append(self, value) -> None:
+        try:
+            self.values.append(value)
+        except OverflowError:
+            self._unpack()
+            self.values.append(value)
+
+    def _extend(self, values:Iterable) -> None:
+        values = list(values)
+        try:
+            self.values.extend(values)
+        except OverflowError:
+            self._unpack()
+            self.values.extend(values)
+
+    def __len__(self):
+        return len(self.values)
+
+    def __getitem__(self, index:Union[int, slice]):
+        if type(index) is slice:
+            output = self._empty_copy()
+            output.values = self.values[index]
+            return output
+
+        self._check_index(index)
+        return self.values[index]
+
+    def __setitem__(self, index:Union[int, slice], value):
+        if type(index) is slice:
+            values = list(value)
+            for item in values:
+                _check_item(self, item)
+            if type(self.values) is array:
+                try:
+                    values = array(self.values.typecode, values)
+                except OverflowError:
+                    self._unpack()
+        else:
+            self._check_index(index)
+            _check_item(self, value)
+            values = value
+
+        try:
+            self.values[index] = values
+        except OverflowError:
+            self._unpack()
+            self.values[index] = values
+
+    def __delitem__(self, index:Union[int, slice]):
+        if type(index) is not slice:
+            self._check_index(index)
+
+        del self.values[index]
+
+    #Remove an item and return it, by default the last one
+    def pop(self, index:int=-1):
+        self._check_index(index)
+        return self.values.pop(index)
+
+    def extend(self, items:Iterable) -> None:
+        values = list(items)
+        for item in values:
+            _check_item(self, item)
+
+        self._extend(values)
+
+    def insert(self, index:int, value):
+        _check_item(self, value)
+        try:
+            self.values.insert(index, value)
+        except OverflowError:
+            self._unpack()
+            self.values.insert(index, value)
+
+    def __iter__(self):
+        return iter(self.values)
+
+    def __reversed__(self):
+        return reversed(self.values)
+
+    #Get the items of another series or container to add to this one, after checking their type
+    def _other_values(self, other) -> list:
+        if type(other) is list or type(other) is tuple or type(other) is set:
+            other = CompactSeries(other)
+
+        if type(other) in SERIES_TYPES:
+            if self.type != other.type:
+                raise TypeError(f'cannot add series of type {other.type.__name__} to series of type {self.type.__name__}')
+            _check_added(other, self.subType)
+
+            return list(other)
+
+        raise TypeError(f'cannot add object of type {type(other).__name__} to series of type {self.type.__name__}')
+
+    def __add__(self, other):
+        result = self.deepcopy()
+        result += other
+        return result
+
+    def __radd__(self, other):
+        if _is_item(self, other):
+            _check_item(self, other)
+            output = CompactSeries(other, self.type)
+        elif type(other) is list or type(other) is tuple or type(other) is set:
+            output = CompactSeries(other)
+            if output.type != self.type:
+                raise TypeError(f'cannot add series of type {self.type.__name__} to container containing type {output.type.__name__}')
+            _check_added(output, self.subType)
+        else:
+            raise TypeError(f'cannot add series of type {self.type.__name__} to object of type {type(other).__name__}')
+
+        output.subType = self.subType
+        output._extend(self.deepcopy().values)
+        return output
+
+    def __iadd__(self, other):
+        if _is_item(self, other):
+            _check_item(self, other)
+            self._append(other)
+        else:
+            self._extend(self._other_values(other))
+
+        return self
+
+    def __str__(self):
+        return '<' + ', '.join(str(item) for item in self.values) + '>'
+
+    def __repr__(self):
+        return _repr_series('CompactSeries', self.values, self.type, self.subType)
+
+    def __list__(self):
+        return list(self.values)
+
+    def __set__(self):
+        return set(self.values)
+
+    def _empty_copy(self):
+        output = object.__new__(CompactSeries)
+        output.type = self.type
+        output.subType = self.subType
+        return output
+
+    def copy(self):
+        output = self._empty_copy()
+        output.values = self.values[:]
         return output
 
     def deepcopy(self):
+        output = self._empty_copy()
+        if self.values and hasattr(self.values[0], 'deepcopy'):
+            output.values = [item.deepcopy() for item in self.values]
+        else:
+            output.values = self.values[:]
+
+        return output
+
+#Get the items that a series is created from, and their type
+def _items_and_type(item:Any, selfType:type) -> tuple:
+    if type(item) is selfType:
+        return [item], selfType
+
+    elif type(item) in CONTAINER_TYPES or isinstance(item, Iterator):
+        values = list(item)
+        if not values:
+            raise IndexError('cannot create series from empty container')
+
+        firstType = type(values[0])
+        if selfType and firstType is not selfType:
+            raise TypeError(f'type of given item {values[0]} is not the same as given type {selfType}')
+
+        for value in values:
+            if type(value) is not firstType:
+                raise TypeError('container passed to series must be of uniform type')
+
+        return values, firstType
+
+    else:
+        if selfType and type(item) is not selfType:
+            raise TypeError(f'type of given item {item} is not the same as given type {selfType}')
+
+        return [item], type(item)
+
+#Check that every item is a series of the subtype, if one is given
+def _check_subtype(items:Iterable, selfType:type, subType:type) -> Union[type, None]:
+    if subType is None:
+        return None
+
+    if selfType not in SERIES_TYPES:
+        raise TypeError('series type must be series if subtype is given')
+
+    for series in items:
+        if series.type != subType:
+            raise TypeError(f'series type {series.type} must be equal to subtype {subType}')
+
+    return subType
+
+#Check the type, and the subtype if there is one, of an item being added to a series
+def _check_item(series, value) -> None:
+    if type(value) is not series.type:
+        raise TypeError(f'cannot add object of type {type(value).__name__} to series of type {series.type.__name__}')
+    if series.subType is not None and value.type != series.subType:
+        raise TypeError(f'series of type {value.type} cannot be appended to series of subtype {series.subType}')
+
+#Whether an object being added to a series is a single item, rather than a series or container of items
+#A series of series with a subtype tells them apart by the type of the object's own items
+def _is_item(series, other) -> bool:
+    return type(other) is series.type and (series.subType is None or other.type == series.subType)
+
+#Check the items of a series or container being added to a series of series against its subtype
+#A series that was already checked against the same subtype is not checked again
+def _check_added(items:Iterable, subType:Union[type, None]) -> None:
+    if subType is None or getattr(items, 'subType', None) == subType:
+        return
+
+    for series in items:
+        if series.type != subType:
+            raise TypeError(f'series of type {series.type} cannot be appended to series of subtype {subType}')
+
+def _type_repr(valueType:type) -> str:
+    if valueType in SERIES_TYPES:
+        return f'series.{valueType.__name__}'
+    else:
+        return valueType.__name__
+
+def _repr_series(name:str, items:Iterable, selfType:type, subType:Union[type, None]) -> str:
+    output = f'series.{name}([' + ', '.join(repr(item) for item in items) + f'], {_type_repr(selfType)}'
+    if subType is not None:
+        output += f', {_type_repr(subType)}'
+
+    return output + ')'
+
+#The array typecodes used to store series of each type compactly
+ARRAY_TYPECODES = {int: 'q', float: 'd'}
+
+#Store values in an array if their type has a typecode and they all fit, otherwise in a list
+def _pack(valueType:type, values:list) -> Union[array, list]:
+    typecode = ARRAY_TYPECODES.get(valueType)
+    if typecode is not None:
         try:
-            output = Series(self[0].deepcopy(), self.type, self.subType)
-            
-        except AttributeError:
-            output = Series(self[0], self.type, self.subType)
-            current = output
-            for i in range(1, len(self)):
-                current.next = Series(self[i])
-                current = current.next
-                
-        else: #continue code in try block
-            current = output
-            for i in range(1, len(self)):
-                current.next = Series(self[i].deepcopy(), self.type, self.subType)
-                current = current.next
+            return array(typecode, values)
+        except OverflowError:
+            pass
+
+    return values
+
+#The largest number of items kept together in one leaf of a persistent series
+LEAF_SIZE = 32
+
+class _Branch:
+    #A node of a persistent series holding two subtrees, which are never changed after creation
+    __slots__ = ('left', 'right', 'length', 'depth')
+
+    def __init__(self, left, right):
+        self.left = left
+        self.right = right
+        self.length = _size(left) + _size(right)
+        self.depth = max(_depth(left), _depth(right)) + 1
+
+#Leaves are tuples of items, and the empty tuple is an empty tree
+def _size(tree) -> int:
+    return len(tree) if type(tree) is tuple else tree.length
+
+def _depth(tree) -> int:
+    return 0 if type(tree) is tuple else tree.depth
+
+#Build a balanced tree from a list of items
+def _build_tree(items:list):
+    level = [tuple(items[i:i + LEAF_SIZE]) for i in range(0, len(items), LEAF_SIZE)]
+    if not level:
+        return ()
+
+    while len(level) > 1:
+        nextLevel = [_Branch(level[i], level[i + 1]) for i in range(0, len(level) - 1, 2)]
+        if len(level) % 2:
+            nextLevel.append(level[-1])
+        level = nextLevel
+
+    return level[0]
+
+#Join two subtrees that differ in depth by at most two, rotating if needed to keep them balanced
+def _balance(left, right):
+    leftDepth = _depth(left)
+    rightDepth = _depth(right)
+    if leftDepth > rightDepth + 1:
+        if _depth(left.left) >= _depth(left.right):
+            return _Branch(left.left, _Branch(left.right, right))
+
+        middle = left.right
+        return _Branch(_Branch(left.left, middle.left), _Branch(middle.right, right))
+
+    if rightDepth > leftDepth + 1:
+        if _depth(right.right) >= _depth(right.left):
+            return _Branch(_Branch(left, right.left), right.right)
+
+        middle = right.left
+        return _Branch(_Branch(left, middle.left), _Branch(middle.right, right.right))
+
+    return _Branch(left, right)
+
+#Concatenate two trees in O(log n), copying only the nodes along one edge of the taller tree
+def _join(left, right):
+    if not _size(left):
+        return right
+    if not _size(right):
+        return left
+
+    if type(left) is tuple and type(right) is tuple and len(left) + len(right) <= LEAF_SIZE:
+        return left + right
+
+    leftDepth = _depth(left)
+    rightDepth = _depth(right)
+    if leftDepth > rightDepth + 1:
+        return _balance(left.left, _join(left.right, right))
+    elif rightDepth > leftDepth + 1:
+        return _balance(_join(left, right.left), right.right)
+    else:
+        return _Branch(left, right)
+
+#Split a tree into the first index items and the rest
+def _split(tree, index:int) -> tuple:
+    if type(tree) is tuple:
+        return tree[:index], tree[index:]
+
+    leftLength = _size(tree.left)
+    if index < leftLength:
+        first, rest = _split(tree.left, index)
+        return first, _join(rest, tree.right)
+    elif index > leftLength:
+        first, rest = _split(tree.right, index - leftLength)
+        return _join(tree.left, first), rest
+    else:
+        return tree.left, tree.right
+
+def _get(tree, index:int):
+    while type(tree) is not tuple:
+        leftLength = _size(tree.left)
+        if index < leftLength:
+            tree = tree.left
+        else:
+            index -= leftLength
+            tree = tree.right
+
+    return tree[index]
+
+#Get a copy of a tree with one item replaced, sharing every node off the path to it
+def _set(tree, index:int, value):
+    if type(tree) is tuple:
+        return tree[:index] + (value,) + tree[index + 1:]
+
+    leftLength = _size(tree.left)
+    if index < leftLength:
+        return _Branch(_set(tree.left, index, value), tree.right)
+    else:
+        return _Branch(tree.left, _set(tree.right, index - leftLength, value))
+
+#Get the leaves of a tree in order, or in reverse
+def _leaves(tree, reverse:bool=False):
+    stack = [tree]
+    while stack:
+        tree = stack.pop()
+        if type(tree) is tuple:
+            yield tree
+        elif reverse:
+            stack.append(tree.left)
+            stack.append(tree.right)
+        else:
+            stack.append(tree.right)
+            stack.append(tree.left)
+
+class PersistentSeries:
+    #A series whose items are kept in a balanced tree of immutable nodes
+    #Concatenation shares the nodes of both operands and takes O(log n), and changes copy only the nodes that they affect
+    def __init__(self, item:Any, selfType:type=None, subType:type=None):
+        values, self.type = _items_and_type(item, selfType)
+        self.subType = _check_subtype(values, selfType, subType)
+        self._root = _build_tree(values)
+
+    from_iterable = classmethod(_from_iterable)
+
+    #Create a series with the same type and subtype as this one, from a tree
+    def _with_root(self, root):
+        output = object.__new__(PersistentSeries)
+        output.type = self.type
+        output.subType = self.subType
+        output._root = root
+        return output
+
+    def to_series(self) -> Series:
+        return Series(iter(self), self.type, self.subType)
+
+    def lazy(self):
+        return LazySeries(iter(self), self.type, self.subType)
+
+    def numeric(self):
+        return NumericSeries(iter(self), self.type)
+
+    def _index(self, index:int) -> int:
+        length = _size(self._root)
+        if index < 0:
+            index += length
+        if index < 0 or index >= length:
+            raise IndexError('series index out of range')
+
+        return index
+
+    #Get a tree of the items of another series or container, after checking their type
+    def _other_root(self, other):
+        if type(other) is PersistentSeries:
+            if self.type != other.type:
+                raise TypeError(f'cannot add series of type {other.type.__name__} to series of type {self.type.__name__}')
+            _check_added(other, self.subType)
+
+            return other._root
+
+        if type(other) is list or type(other) is tuple or type(other) is set:
+            other = PersistentSeries(other)
+        elif type(other) in SERIES_TYPES:
+            other = PersistentSeries(iter(other), other.type)
+        else:
+            raise TypeError(f'cannot add object of type {type(other).__name__} to series of type {self.type.__name__}')
+
+        if self.type != other.type:
+            raise TypeError(f'cannot add series of type {other.type.__name__} to series of type {self.type.__name__}')
+        _check_added(other, self.subType)
+
+        return other._root
+
+    def __len__(self):
+        return _size(self._root)
+
+    def __getitem__(self, index:Union[int, slice]):
+        if type(index) is not slice:
+            return _get(self._root, self._index(index))
+
+        start, stop, step = index.indices(len(self))
+        if step == 1:
+            if start >= stop:
+                return self._with_root(())
+            return self._with_root(_split(_split(self._root, stop)[0], start)[1])
+
+        return self._with_root(_build_tree([_get(self._root, i) for i in range(start, stop, step)]))
+
+    def __setitem__(self, index:Union[int, slice], value):
+        if type(index) is slice:
+            values = list(value)
+            for item in values:
+                _check_item(self, item)
+
+            start, stop, step = index.indices(len(self))
+            if step == 1:
+                stop = max(start, stop)
+                first, rest = _split(self._root, start)
+                self._root = _join(_join(first, _build_tree(values)), _split(rest, stop - start)[1])
+                return
+
+            positions = range(start, stop, step)
+            if len(values) != len(positions):
+                raise ValueError(f'attempt to assign sequence of size {len(values)} to extended slice of size {len(positions)}')
+            for position, item in zip(positions, values):
+                self._root = _set(self._root, position, item)
+            return
+
+        _check_item(self, value)
+        self._root = _set(self._root, self._index(index), value)
+
+    def __delitem__(self, index:Union[int, slice]):
+        if type(index) is not slice:
+            index = self._index(index)
+            first, rest = _split(self._root, index)
+            self._root = _join(first, _split(rest, 1)[1])
+            return
+
+        start, stop, step = index.indices(len(self))
+        if step == 1:
+            if start < stop:
+                first, rest = _split(self._root, start)
+                self._root = _join(first, _split(rest, stop - start)[1])
+            return
+
+        removed = set(range(start, stop, step))
+        self._root = _build_tree([item for i, item in enumerate(self) if i not in removed])
+
+    #Remove an item and return it, by default the last one
+    def pop(self, index:int=-1):
+        index = self._index(index)
+        value = _get(self._root, index)
+        del self[index]
+        return value
+
+    def insert(self, index:int, value):
+        _check_item(self, value)
+        length = len(self)
+        if index < 0:
+            index = max(index + length, 0)
+
+        first, rest = _split(self._root, min(index, length))
+        self._root = _join(_join(first, (value,)), rest)
+
+    def extend(self, items:Iterable) -> None:
+        values = list(items)
+        for item in values:
+            _check_item(self, item)
+
+        self._root = _join(self._root, _build_tree(values))
+
+    def __iter__(self):
+        for leaf in _leaves(self._root):
+            yield from leaf
+
+    def __reversed__(self):
+        for leaf in _leaves(self._root, reverse=True):
+            yield from reversed(leaf)
+
+    def __add__(self, other):
+        if _is_item(self, other):
+            _check_item(self, other)
+            return self._with_root(_join(self._root, (other,)))
+
+        return self._with_root(_join(self._root, self._other_root(other)))
+
+    def __radd__(self, other):
+        if _is_item(self, other):
+            _check_item(self, other)
+            return self._with_root(_join((other,), self._root))
+
+        return self._with_root(_join(self._other_root(other), self._root))
+
+    def __iadd__(self, other):
+        if _is_item(self, other):
+            _check_item(self, other)
+            self._root = _join(self._root, (other,))
+        else:
+            self._root = _join(self._root, self._other_root(other))
+
+        return self
+
+    def __str__(self):
+        return '<' + ', '.join(str(item) for item in self) + '>'
+
+    def __repr__(self):
+        return _repr_series('PersistentSeries', self, self.type, self.subType)
+
+    def __list__(self):
+        return list(self)
+
+    def __set__(self):
+        return set(self)
+
+    #The nodes are never changed, so a copy can share all of them
+    def copy(self):
+        return self._with_root(self._root)
+
+    def deepcopy(self):
+        if len(self) and hasattr(_get(self._root, 0), 'deepcopy'):
+            return self._with_root(_build_tree([item.deepcopy() for item in self]))
+
+        return self.copy()
+
+#Marks that no initial value was given to LazySeries.reduce
+_NO_INITIAL = object()
+
+class LazySeries:
+    #A series whose items are pulled from an iterator one at a time, so that only the current item is held in memory
+    #Each item is checked against the type, which is taken from the first item if not given, and the subtype as it is pulled
+    #Like any iterator, it can only be consumed once
+    def __init__(self, items:Iterable, selfType:type=None, subType:type=None):
+        if subType is not None and selfType not in SERIES_TYPES:
+            raise TypeError('series type must be series if subtype is given')
+
+        self._items = iter(items)
+        self.type = selfType
+        self.subType = subType
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        item = next(self._items)
+        if self.type is None:
+            self.type = type(item)
+        elif type(item) is not self.type:
+            raise TypeError(f'cannot add object of type {type(item).__name__} to series of type {self.type.__name__}')
+
+        if self.subType is not None and item.type != self.subType:
+            raise TypeError(f'series type {item.type} must be equal to subtype {self.subType}')
+
+        return item
+
+    #Apply a function to every item, giving a series of the results
+    def map(self, function, outputType:type=None, subType:type=None):
+        return LazySeries(map(function, self), outputType, subType)
+
+    #Keep only the items for which a function returns a truthy value
+    def filter(self, function):
+        return LazySeries(filter(function, self), self.type, self.subType)
+
+    #Keep only the first number items
+    def take(self, number:int):
+        return LazySeries(islice(self, number), self.type, self.subType)
+
+    #Group the items into series of the given size, with a shorter last series if the items run out
+    def chunk(self, size:int, chunkType:type=None):
+        if size < 1:
+            raise ValueError('chunk size must be at least 1')
+        if chunkType is None:
+            chunkType = Series
+
+        return LazySeries(self._chunks(size, chunkType), chunkType)
+
+    def _chunks(self, size:int, chunkType:type):
+        while True:
+            items = list(islice(self, size))
+            if not items:
+                return
+
+            yield chunkType(items, self.type, self.subType)
+
+    #Combine the items from left to right with a function of two arguments, consuming the series
+    def reduce(self, function, initial:Any=_NO_INITIAL):
+        if initial is _NO_INITIAL:
+            return reduce(function, self)
+        else:
+            return reduce(function, self, initial)
+
+    #Pull every remaining item into a series, by default a Series
+    def collect(self, seriesType:type=None):
+        if seriesType is None:
+            seriesType = Series
+
+        items = list(self)
+        if not items:
+            raise IndexError('cannot create series from empty container')
+
+        return seriesType(items, self.type, self.subType)
+
+    def __repr__(self):
+        typeName = 'None' if self.type is None else _type_repr(self.type)
+        output = f'series.LazySeries(<iterator>, {typeName}'
+        if self.subType is not None:
+            output += f', {_type_repr(self.subType)}'
+
+        return output + ')'
+
+#The item types that a numeric series can hold
+NUMERIC_TYPES = (int, float, Fraction)
+
+#The elementwise operations of a numeric series
+NUMERIC_OPERATIONS = {'add': add, 'sub': sub, 'mul': mul, 'truediv': truediv}
+
+#Store numbers in the fastest available form: a FractionArray for fractions, a NumPy array for floats and ints that fit in 64 bits, or a list
+def _numeric_values(values:list, valueType:type):
+    if valueType is Fraction:
+        return FractionArray(values)
+
+    if np is not None:
+        if valueType is float:
+            return np.array(values, dtype=np.float64)
+        if _max_abs(values) <= INT64_MAX:
+            return np.array(values, dtype=np.int64)
+
+    return values
+
+def _numeric_list(values) -> list:
+    if type(values) is list:
+        return values
+    elif type(values) is FractionArray:
+        return values.to_fractions()
+    else:
+        return values.tolist()
+
+#Convert stored numbers to a wider type, where ints widen to floats and both widen to fractions
+def _widen(values, fromType:type, toType:type):
+    if fromType is toType:
+        return values
+    elif toType is float and type(values) is not list:
+        return values.astype(np.float64)
+    else:
+        return _numeric_values([toType(value) for value in _numeric_list(values)], toType)
+
+class NumericSeries:
+    #A series of ints, floats or fractions with elementwise arithmetic and aggregates that run over whole buffers at once
+    #The arithmetic has its own methods, since + concatenates every other kind of series
+    def __init__(self, item:Any, selfType:type=None):
+        values, self.type = _items_and_type(item, selfType)
+        if self.type not in NUMERIC_TYPES:
+            raise TypeError(f'numeric series cannot hold type {self.type.__name__}')
+
+        self.values = _numeric_values(values, self.type)
+
+    def _with_values(self, values, valueType:type):
+        output = object.__new__(NumericSeries)
+        output.type = valueType
+        output.values = values
+        return output
+
+    def to_series(self) -> Series:
+        return Series(self._list(), self.type)
+
+    def _list(self) -> list:
+        return _numeric_list(self.values)
+
+    def __len__(self):
+        return len(self.values)
+
+    def __getitem__(self, index:Union[int, slice]):
+        values = self.values
+        if type(index) is slice:
+            if type(values) is FractionArray:
+                return self._with_values(FractionArray.from_nums(values.num[index], values.dem[index]), Fraction)
+            return self._with_values(values[index], self.type)
+
+        if index >= len(values) or -index > len(values):
+            raise IndexError('series index out of range')
+
+        value = values[index]
+        return value if type(values) is list or type(values) is FractionArray else self.type(value)
+
+    def __iter__(self):
+        return iter(self._list())
+
+    #Apply an operation between every item and either a number or the item at the same position of another numeric series
+    def _arithmetic(self, other, name:str):
+        if type(other) is NumericSeries:
+            if len(other) != len(self):
+                raise ValueError(f'cannot combine series of lengths {len(self)} and {len(other)}')
+            otherType = other.type
+        elif type(other) in NUMERIC_TYPES:
+            otherType = type(other)
+        elif type(other) is FrozenFraction:
+            otherType = Fraction
+        else:
+            raise TypeError(f'cannot apply {name} to series of type {self.type.__name__} and object of type {type(other).__name__}')
+
+        if Fraction in (self.type, otherType):
+            resultType = Fraction
+        elif float in (self.type, otherType) or name == 'truediv':
+            resultType = float
+        else:
+            resultType = int
+
+        values = _widen(self.values, self.type, resultType)
+        if type(other) is NumericSeries:
+            otherValues = _widen(other.values, otherType, resultType)
+        else:
+            otherValues = other if resultType is Fraction else resultType(other)
+
+        #FractionArray already refuses a zero denominator
+        if name == 'truediv' and resultType is float:
+            if type(otherValues) is list:
+                hasZero = 0 in otherValues
+            elif type(other) is NumericSeries:
+                hasZero = bool((otherValues == 0).any())
+            else:
+                hasZero = otherValues == 0
+            if hasZero:
+                raise ZeroDivisionError('division by zero')
+
+        #NumPy ints wrap around on overflow, so Python ints are used when the result could need more than 64 bits
+        if resultType is int and type(values) is not list:
+            otherMax = _max_abs(otherValues) if type(other) is NumericSeries else abs(otherValues)
+            bound = _max_abs(values) * otherMax if name == 'mul' else _max_abs(values) + otherMax
+            if bound > INT64_MAX:
+                values = values.tolist()
+
+        operation = NUMERIC_OPERATIONS[name]
+        if type(values) is list or type(otherValues) is list:
+            values = _numeric_list(values)
+            if type(other) is NumericSeries:
+                result = [operation(a, b) for a, b in zip(values, _numeric_list(otherValues))]
+            else:
+                result = [operation(a, otherValues) for a in values]
+            return self._with_values(_numeric_values(result, resultType), resultType)
+
+        return self._with_values(operation(values, otherValues), resultType)
+
+    def add(self, other):
+        return self._arithmetic(other, 'add')
+
+    def sub(self, other):
+        return self._arithmetic(other, 'sub')
+
+    def mul(self, other):
+        return self._arithmetic(other, 'mul')
+
+    def truediv(self, other):
+        return self._arithmetic(other, 'truediv')
+
+    #Whether the running total of the absolute values could overflow a 64 bit int
+    def _may_overflow(self) -> bool:
+        return self.type is int and _max_abs(self.values) * len(self.values) > INT64_MAX
+
+    def sum(self):
+        values = self.values
+        if type(values) is FractionArray:
+            return sum_fractions(values)
+        elif type(values) is list or self._may_overflow():
+            return self.type(sum(_numeric_list(values)))
+        else:
+            return self.type(values.sum())
+
+    def min(self):
+        if not len(self):
+            raise ValueError('cannot get the minimum of an empty series')
+
+        values = self.values
+        if type(values) is list or type(values) is FractionArray:
+            return min(_numeric_list(values))
+        else:
+            return self.type(values.min())
+
+    def max(self):
+        if not len(self):
+            raise ValueError('cannot get the maximum of an empty series')
+
+        values = self.values
+        if type(values) is list or type(values) is FractionArray:
+            return max(_numeric_list(values))
+        else:
+            return self.type(values.max())
+
+    #Get the mean of the items, as a fraction for a series of fractions and as a float otherwise
+    def mean(self):
+        if not len(self):
+            raise ValueError('cannot get the mean of an empty series')
+
+        if self.type is Fraction:
+            return self.sum() / len(self)
+        elif type(self.values) is list:
+            return self.sum() / len(self)
+        else:
+            return float(self.values.mean())
+
+    #Get a series of the running totals of the items
+    def cumsum(self):
+        values = self.values
+        if type(values) is FractionArray:
+            total = Accumulator()
+            return self._with_values(FractionArray(total.add(value).value for value in values), Fraction)
+        elif type(values) is list or self._may_overflow():
+            return self._with_values(_numeric_values(list(accumulate(_numeric_list(values))), self.type), self.type)
+        else:
+            return self._with_values(values.cumsum(), self.type)
+
+    def __str__(self):
+        return '<' + ', '.join(str(item) for item in self) + '>'
+
+    def __repr__(self):
+        return _repr_series('NumericSeries', self, self.type, None)
+
+    def copy(self):
+        values = self.values
+        if type(values) is FractionArray:
+            return self._with_values(FractionArray.from_nums(values.num[:], values.dem[:]), Fraction)
+
+        return self._with_values(values[:] if type(values) is list else values.copy(), self.type)
+
+#The first bytes of a saved series
+SERIES_MAGIC = b'KLS2'
+
+#Each saved series starts with the magic bytes, the kind of its items, the number of items and the length of its metadata
+#The metadata is the names of its class, type and subtype, which are looked up in SAVED_TYPES rather than unpickled
+_HEADER = struct.Struct('<4sc3xQI')
+_LENGTH = struct.Struct('<I')
+
+#The kinds of item that are stored as packed 64 bit values, with their array typecodes
+PACKED_TYPECODES = {b'q': 'q', b'd': 'd'}
+
+#The number of items packed at a time while saving
+SAVE_CHUNK = 65536
+
+#Get the buffer of a series that already stores its items packed with the given typecode, if it does
+def _packed_buffer(series, typecode:str) -> Union[memoryview, None]:
+    values = getattr(series, 'values', None)
+    if type(values) is array:
+        packed = values.typecode == typecode
+    elif type(values) is memoryview:
+        packed = values.format == typecode and values.c_contiguous
+    elif np is not None and type(values) is np.ndarray:
+        packed = values.dtype == np.dtype(typecode) and values.flags.c_contiguous
+    else:
+        packed = False
+
+    return memoryview(values) if packed else None
+
+#Get the kind of a series' items: packed ints or floats, variable length ints, strings, fractions, nested series, or anything else pickled
+def _series_kind(series) -> bytes:
+    itemType = series.type
+    if itemType is int:
+        if _packed_buffer(series, 'q') is not None:
+            return b'q'
+        return b'q' if all(-INT64_MAX - 1 <= item <= INT64_MAX for item in series) else b'i'
+    elif itemType is float:
+        return b'd'
+    elif itemType is str:
+        return b's'
+    elif itemType is Fraction or itemType is FrozenFraction:
+        return b'f'
+    elif itemType in SERIES_TYPES:
+        return b'S'
+    else:
+        return b'p'
+
+def _write_bytes(file, data:bytes) -> None:
+    file.write(_LENGTH.pack(len(data)))
+    file.write(data)
+
+def _int_bytes(value:int) -> bytes:
+    return value.to_bytes(value.bit_length() // 8 + 1, 'little', signed=True)
+
+#Get the name that a type is saved under: '' for None, and '?' for a type that is not in SAVED_TYPES
+def _type_name(cls:Union[type, None]) -> str:
+    if cls is None:
+        return ''
+
+    return cls.__name__ if SAVED_TYPES.get(cls.__name__) is cls else '?'
+
+#Get the type saved under a name, or None for '' and '?'
+def _named_type(name:str) -> Union[type, None]:
+    if name == '' or name == '?':
+        return None
+    if name not in SAVED_TYPES:
+        raise ValueError(f'unknown type {name!r} in saved series')
+
+    return SAVED_TYPES[name]
+
+def _write_series(file, series) -> None:
+    kind = _series_kind(series)
+    subType = getattr(series, 'subType', None)
+    names = (type(series).__name__, _type_name(series.type), _type_name(subType))
+    metadata = '\0'.join(names).encode('utf-8')
+    file.write(_HEADER.pack(SERIES_MAGIC, kind, len(series), len(metadata)))
+    file.write(metadata)
+
+    #Items start at a multiple of 8 bytes into the file, so that packed items can be mapped in place
+    file.write(bytes(-file.tell() % 8))
+
+    #Pickled items are only loaded with allowPickle, so types outside SAVED_TYPES are pickled along with them
+    if kind == b'p' and '?' in names[1:]:
+        _write_bytes(file, pickle.dumps((series.type, subType)))
+
+    if kind in PACKED_TYPECODES:
+        buffer = _packed_buffer(series, PACKED_TYPECODES[kind])
+        if buffer is not None and sys.byteorder == 'little':
+            file.write(buffer)
+            return
+
+        items = iter(series)
+        while True:
+            chunk = array(PACKED_TYPECODES[kind], islice(items, SAVE_CHUNK))
+            if not chunk:
+                return
+            if sys.byteorder == 'big':
+                chunk.byteswap()
+            chunk.tofile(file)
+
+    for item in series:
+        if kind == b'i':
+            _write_bytes(file, _int_bytes(item))
+        elif kind == b's':
+            _write_bytes(file, item.encode('utf-8', 'surrogatepass'))
+        elif kind == b'f':
+            _write_bytes(file, _int_bytes(item.num))
+            _write_bytes(file, _int_bytes(item.dem))
+        elif kind == b'S':
+            _write_series(file, item)
+        else:
+            _write_bytes(file, pickle.dumps(item))
+
+#Write a series to a file, along with its type and subtype, one chunk of items at a time
+def save_series(series, path:str) -> None:
+    if type(series) not in SERIES_TYPES:
+        raise TypeError(f'cannot save object of type {type(series).__name__}')
+
+    with open(path, 'wb') as file:
+        _write_series(file, series)
+
+#Check that a file has the bytes that its header says it has, rather than loading fewer items from a truncated file
+def _check_size(data, end:int) -> None:
+    if end > len(data):
+        raise ValueError('saved series is shorter than its header says')
+
+def _read_bytes(data, offset:int) -> tuple:
+    _check_size(data, offset + _LENGTH.size)
+    length, = _LENGTH.unpack_from(data, offset)
+    offset += _LENGTH.size
+    _check_size(data, offset + length)
+    return data[offset:offset + length], offset + length
+
+#Read a saved series starting at an offset, returning its items, class name, type, subtype and the offset after it
+#Pickled items and types are refused unless allowPickle is True, since the kind of the items is read from the file itself
+def _read_series(data, offset:int, allowPickle:bool) -> tuple:
+    _check_size(data, offset + _HEADER.size)
+    magic, kind, count, metadataLength = _HEADER.unpack_from(data, offset)
+    if magic != SERIES_MAGIC:
+        raise ValueError('data is not a saved series')
+
+    offset += _HEADER.size
+    _check_size(data, offset + metadataLength)
+    names = str(data[offset:offset + metadataLength], 'utf-8').split('\0')
+    if len(names) != 3 or names[0] not in SAVED_TYPES:
+        raise ValueError('data is not a saved series')
+
+    className = names[0]
+    itemType = _named_type(names[1])
+    subType = _named_type(names[2])
+    offset += metadataLength
+    offset += -offset % 8
+
+    if kind == b'p' and not allowPickle:
+        raise ValueError('saved series has pickled items, which are only loaded with allowPickle=True')
+
+    if '?' in names[1:]:
+        if kind != b'p':
+            if names[1] == '?':
+                raise ValueError('saved series has an unknown type')
+        else:
+            types, offset = _read_bytes(data, offset)
+            itemType, subType = pickle.loads(types)
+
+    if kind in PACKED_TYPECODES:
+        end = offset + count * 8
+        _check_size(data, end)
+        values = memoryview(data)[offset:end].cast(PACKED_TYPECODES[kind])
+        if sys.byteorder == 'big':
+            values = array(PACKED_TYPECODES[kind], values)
+            values.byteswap()
+
+        return values, className, itemType, subType, end
+
+    values = []
+    for i in range(count):
+        if kind == b'i' or kind == b'f':
+            num, offset = _read_bytes(data, offset)
+            num = int.from_bytes(num, 'little', signed=True)
+            if kind == b'f':
+                dem, offset = _read_bytes(data, offset)
+                values.append(itemType._from_normalized(num, int.from_bytes(dem, 'little', signed=True)))
+            else:
+                values.append(num)
+        elif kind == b's':
+            item, offset = _read_bytes(data, offset)
+            values.append(str(item, 'utf-8', 'surrogatepass'))
+        elif kind == b'S':
+            items, nestedClass, nestedType, nestedSubType, offset = _read_series(data, offset, allowPickle)
+            values.append(_rebuild_series(itemType, list(items), nestedType, nestedSubType))
+            #A subtype outside SAVED_TYPES is the type of the nested series themselves
+            if names[2] == '?' and subType is None:
+                subType = nestedType
+        else:
+            item, offset = _read_bytes(data, offset)
+            values.append(pickle.loads(item))
+
+    return values, className, itemType, subType, offset
+
+#Create a series of the given class from a list of items, including an empty one, which no constructor can create
+def _rebuild_series(cls:type, items:list, itemType:type, subType:Union[type, None]):
+    if items:
+        return cls(items, itemType) if cls is NumericSeries else cls(items, itemType, subType)
+
+    output = object.__new__(cls)
+    output.type = itemType
+    if cls is NumericSeries:
+        return output._with_values(_numeric_values([], itemType), itemType)
+
+    output.subType = subType
+    if cls is Series:
+        return output._empty()
+    elif cls is PersistentSeries:
+        return output._with_root(())
+    else:
+        output.values = _pack(itemType, []) if cls is CompactSeries else []
+        return output
+
+#Load a series written by save_series as a read-only MappedSeries
+#Packed ints and floats are read straight from a memory map of the file, so only the pages that are used are ever read
+#Items that are not ints, floats, strings, fractions or series are saved pickled, and unpickling can run any code
+#Any file can claim to hold pickled items, so they are refused with ValueError unless allowPickle is True, which should only be given for trusted files
+def load_series(path:str, allowPickle:bool=False):
+    with open(path, 'rb') as file:
+        data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    try:
+        values, className, itemType, subType, end = _read_series(data, 0, allowPickle)
+    except Exception:
+        data.close()
+        raise
+
+    if type(values) is not memoryview:
+        data.close()
+
+    return MappedSeries(values, itemType, subType)
+
+class MappedSeries:
+    #A read-only series of items loaded by load_series
+    #Packed ints and floats stay in a view of the memory-mapped file, which slices share rather than copy
+    def __init__(self, values:Union[memoryview, array, list], selfType:type, subType:type=None):
+        self.values = values
+        self.type = selfType
+        self.subType = subType
+
+    def to_series(self) -> Series:
+        return Series(iter(self.values), self.type, self.subType)
+
+    def compact(self) -> CompactSeries:
+        return CompactSeries(iter(self.values), self.type, self.subType)
+
+    def lazy(self):
+        return LazySeries(iter(self.values), self.type, self.subType)
+
+    #Packed items are shared with the numeric series as a read-only NumPy array, rather than copied
+    def numeric(self):
+        if np is None or type(self.values) is list:
+            return NumericSeries(iter(self.values), self.type)
+
+        output = object.__new__(NumericSeries)
+        output.type = self.type
+        output.values = np.asarray(self.values)
+        return output
+
+    def __len__(self):
+        return len(self.values)
+
+    def __getitem__(self, index:Union[int, slice]):
+        if type(index) is slice:
+            return MappedSeries(self.values[index], self.type, self.subType)
+
+        if index >= len(self.values) or -index > len(self.values):
+            raise IndexError('series index out of range')
+
+        return self.values[index]
+
+    def __iter__(self):
+        return iter(self.values)
+
+    def __reversed__(self):
+        return reversed(self.values)
+
+    def __str__(self):
+        return '<' + ', '.join(str(item) for item in self) + '>'
+
+    def __repr__(self):
+        return _repr_series('MappedSeries', self, self.type, self.subType)
+
+    def __list__(self):
+        return list(self.values)
+
+    def __set__(self):
+        return set(self.values)
+
+#The classes that can hold a series of items
+SERIES_TYPES = (Series, CompactSeries, PersistentSeries, NumericSeries, MappedSeries)
 
-        return output
\ No newline at end of file
+#The classes and item types that a saved series names, so that loading never imports or unpickles a type
+SAVED_TYPES = {cls.__name__: cls for cls in (
+    int, float, complex, bool, str, bytes, bytearray, tuple, list, dict, set, frozenset, type(None),
+    Fraction, FrozenFraction, *SERIES_TYPES
+)}
@@ -1,4 +1,10 @@
-from KlebLib import fraction, polynomial, baseconversion, universaladdition, series
+import math
+import operator
+import os
+import random
+import tempfile
+from fractions import Fraction as StdFraction
+from KlebLib import fraction, fractionarray, polynomial, baseconversion, universaladdition, series
 from typing import Any
 
 class Test:
@@ -9,14 +15,28 @@ class Test:
     def test(self, *args:Any) -> str:
         if self.testType == 'fraction':
             return self._fraction_test(args)
+        elif self.testType == 'fractionrandom':
+            return self._fraction_random_test(args)
         elif self.testType == 'polynomial':
             return self._polynomial_test(args)
+        elif self.testType == 'polynomialproduct':
+            return self._polynomial_product_test(args)
+        elif self.testType == 'polynomialdivision':
+            return self._polynomial_division_test(args)
         elif self.testType == 'baseconversion':
             return self._conversion_test(args)
         elif self.testType == 'universaladdition':
             return self._universal_addition_test(args)
         elif self.testType == 'series':
             return self._series_test(args)
+        elif self.testType == 'seriesoperations':
+            return self._series_operations_test(args)
+        elif self.testType == 'seriesfile':
+            return self._series_file_test(args)
+        elif self.testType == 'fractionarray':
+            return self._fraction_array_test(args)
+        elif self.testType == 'fractionarraynums':
+            return self._fraction_array_nums_test(args)
 
     def __repr__(self):
         output = f'Test({self.testType}, '
@@ -48,6 +68,98 @@ class Test:
 
         return str(fraction3)
 
+    #Apply random operations to fractions and to fractions.Fraction side by side, and check that they always give the same values
+    #The operands must be left as they were, which checks that no operation changes a fraction in place
+    def _fraction_random_test(self, args):
+        fractionClass = getattr(fraction, self.kwargs['fractionType'])
+        rng = random.Random(self.kwargs.get('seed', 0))
+        steps = self.kwargs.get('steps', 500)
+        limit = 10 ** self.kwargs.get('digits', 3)
+        interning = self.kwargs.get('interning', False)
+        wasInterning = fraction.interning_info() is not None
+        if interning:
+            fraction.enable_interning()
+
+        #Get a value as a pair of ints, or as it is if it is not a number
+        def nums(value):
+            if type(value) is StdFraction:
+                return value.numerator, value.denominator
+            elif type(value) is fraction.Fraction or type(value) is fraction.FrozenFraction:
+                return value.num, value.dem
+            elif type(value) is int:
+                return value, 1
+            elif type(value) is tuple:
+                return tuple(nums(item) for item in value)
+            else:
+                return value
+
+        #Get the mixed form of a fractions.Fraction in the form of Fraction.mixed
+        def mixed(value):
+            integerPart = math.trunc(value)
+            remainder = abs(value - integerPart)
+            if integerPart == 0 and value < 0:
+                return [0, [-remainder.numerator, remainder.denominator]]
+            return [integerPart, [remainder.numerator, remainder.denominator]]
+
+        failures = []
+        try:
+            for step in range(steps):
+                num1, dem1 = rng.randint(-limit, limit), rng.choice([-1, 1]) * rng.randint(1, limit)
+                num2, dem2 = rng.randint(-limit, limit), rng.randint(1, limit)
+                float1 = rng.uniform(-limit, limit)
+                first = fractionClass([num1, dem1])
+                second = fractionClass(f'{num2}/{dem2}')
+                expected1 = StdFraction(num1, dem1)
+                expected2 = StdFraction(num2, dem2)
+                exponent = rng.randint(-3, 3)
+                digits = rng.randint(-1, 2)
+
+                checks = [
+                    ('construct', first, expected1),
+                    ('parse', second, expected2),
+                    ('float', fractionClass(float1), StdFraction(float1)),
+                    ('add', first + second, expected1 + expected2),
+                    ('sub', first - second, expected1 - expected2),
+                    ('mul', first * second, expected1 * expected2),
+                    ('add int', first + num2, expected1 + num2),
+                    ('add float', first + float1, expected1 + StdFraction(float1)),
+                    ('neg', -first, -expected1),
+                    ('abs', abs(first), abs(expected1)),
+                    ('bool', bool(first), bool(expected1)),
+                    ('compare', (first < second, first <= second, first > second, first >= second, first == second),
+                        (expected1 < expected2, expected1 <= expected2, expected1 > expected2, expected1 >= expected2, expected1 == expected2)),
+                    ('compare float', (first < float1, first > float1, first == float1), (expected1 < float1, expected1 > float1, expected1 == float1)),
+                    ('hash', hash(first), hash(expected1)),
+                    ('round', (round(first), round(first, digits)), (round(expected1), round(expected1, digits))),
+                    ('floor and ceil', (math.floor(first), math.ceil(first), math.trunc(first), int(first)),
+                        (math.floor(expected1), math.ceil(expected1), math.trunc(expected1), int(expected1))),
+                    ('mixed', first.mixed, mixed(expected1)),
+                    ('format mixed', fraction.parse_mixed(fraction.format_mixed([first]))[0], expected1),
+                    ('sum', fraction.sum_fractions([first, second, num2]), expected1 + expected2 + num2)
+                ]
+                if num2:
+                    checks += [
+                        ('truediv', first / second, expected1 / expected2),
+                        ('floordiv', first // second, expected1 // expected2),
+                        ('mod', first % second, expected1 % expected2),
+                        ('divmod', divmod(first, second), divmod(expected1, expected2))
+                    ]
+                if num1 or exponent >= 0:
+                    checks.append(('pow', first ** exponent, expected1 ** exponent))
+
+                checks.append(('operands unchanged', (first, second), (expected1, expected2)))
+                for name, value, expected in checks:
+                    if nums(value) != nums(expected):
+                        failures.append((step, name, str(value), str(expected)))
+
+                if failures:
+                    break
+        finally:
+            if interning and not wasInterning:
+                fraction.disable_interning()
+
+        return str({'fractionType': self.kwargs['fractionType'], 'steps': steps, 'failures': failures})
+
     def _polynomial_test(self, args):
         testPolynomial = polynomial.Polynomial(self.kwargs['polynomial'])
 
@@ -61,6 +173,109 @@ class Test:
             'integrated': integrated.polynomial
         })
 
+    #Get a random coefficient of the kind given by the coefficients keyword: 'int', 'float' or 'fraction'
+    def _random_coefficient(self, rng):
+        kind = self.kwargs.get('coefficients', 'int')
+        if kind == 'float':
+            return rng.uniform(-10, 10)
+        elif kind == 'fraction':
+            return fraction.FrozenFraction([rng.randint(-9, 9), rng.randint(1, 9)])
+        else:
+            return rng.randint(-9, 9)
+
+    #Get a random polynomial with a term for each power of the first variable below length, each kept with the chance given by density
+    #Any other variables are given small random exponents, which makes the polynomial sparse
+    def _random_polynomial(self, rng, length:int):
+        variables = self.kwargs.get('variables', ['x'])
+        density = self.kwargs.get('density', 1)
+        terms = []
+        for exponent in range(length):
+            if rng.random() < density:
+                term = {variable: rng.randint(0, 2) for variable in variables[1:]}
+                term[variables[0]] = exponent
+                term['num'] = self._random_coefficient(rng)
+                terms.append(term)
+
+        #The leading term is never left out, so the length sets the degree
+        if not terms or terms[-1][variables[0]] != length - 1:
+            terms.append({variables[0]: length - 1, 'num': rng.randint(1, 9)})
+
+        return polynomial.Polynomial(terms)
+
+    #Check that two polynomials have the same terms, within rounding for float coefficients
+    #The rounding is relative to the largest coefficient of either polynomial, or of any others given that cancelled to make them
+    def _same_polynomials(self, first, second, *others) -> bool:
+        if self.kwargs.get('coefficients', 'int') != 'float':
+            return first == second
+
+        keys = first._terms.keys() | second._terms.keys()
+        scale = max([1.0] + [abs(value) for each in (first, second, *others) for value in each._terms.values()])
+        return all(abs(first._terms.get(key, 0) - second._terms.get(key, 0)) <= 1e-9 * scale for key in keys)
+
+    #Multiply two random polynomials, and check the result against term by term multiplication
+    #The method is the one that the product is dispatched to: NumPy's convolution, Karatsuba's method or term by term
+    def _polynomial_product_test(self, args):
+        rng = random.Random(self.kwargs.get('seed', 0))
+        first = self._random_polynomial(rng, self.kwargs['length'])
+        second = self._random_polynomial(rng, self.kwargs.get('otherLength', self.kwargs['length']))
+
+        dense = None
+        if min(len(first._terms), len(second._terms)) >= polynomial.DENSE_MIN_TERMS:
+            dense = first._dense_pair(second, polynomial.DENSE_MIN_DENSITY)
+        if dense is None:
+            method = 'sparse'
+        elif polynomial.np is not None and all(type(value) is float for value in dense[1] + dense[2]):
+            method = 'convolve'
+        else:
+            method = 'karatsuba'
+
+        product = first * second
+        sparse = polynomial.Polynomial._from_terms(first._multiply_sparse(second))
+        square = polynomial.Polynomial._from_terms(first._multiply_sparse(first))
+        output = {
+            'method': method,
+            'terms': len(product._terms),
+            'same product': self._same_polynomials(product, sparse),
+            'same power': self._same_polynomials(first ** 3, polynomial.Polynomial._from_terms(square._multiply_sparse(first)))
+        }
+
+        #The dense coefficient lists are also multiplied by Karatsuba's method and by the schoolbook method directly
+        if dense is not None and method == 'karatsuba':
+            firstList, secondList = dense[1], dense[2]
+            size = max(len(firstList), len(secondList))
+            firstList = firstList + [0] * (size - len(firstList))
+            secondList = secondList + [0] * (size - len(secondList))
+            output['same karatsuba'] = polynomial._karatsuba(firstList, secondList) == polynomial._schoolbook_dense(firstList, secondList)
+
+        return str(output)
+
+    #Divide a random polynomial by another, or the polynomial strings given, and check that divisor * quotient + remainder gives the dividend back
+    #The remainder must have no term that the leading term of the divisor divides, and an error is given if the division is refused
+    def _polynomial_division_test(self, args):
+        rng = random.Random(self.kwargs.get('seed', 0))
+        if 'polynomial' in self.kwargs:
+            dividend = polynomial.Polynomial(self.kwargs['polynomial'])
+            divisor = polynomial.Polynomial(self.kwargs['divisor'])
+        else:
+            dividend = self._random_polynomial(rng, self.kwargs['length'])
+            divisor = self._random_polynomial(rng, self.kwargs['divisorLength'])
+
+        try:
+            quotient, remainder = divmod(dividend, divisor)
+        except ValueError as error:
+            return str({'error': str(error)})
+
+        product = divisor * quotient
+        orderKey = polynomial._order_key(dividend.order, sorted(set(dividend._variables()) | set(divisor._variables())))
+        leadKey = max(divisor._terms, key=orderKey)
+        return str({
+            'quotient terms': len(quotient._terms),
+            'remainder terms': len(remainder._terms),
+            'same dividend': self._same_polynomials(product + remainder, dividend, product),
+            'reduced remainder': all(polynomial._divide_monomials(key, leadKey) is None for key in remainder._terms),
+            'same floor and mod': (dividend // divisor, dividend % divisor) == (quotient, remainder)
+        })
+
     def _conversion_test(self, args):
         num = self.kwargs['num']
         base = self.kwargs['base']
@@ -78,4 +293,191 @@ class Test:
     def _series_test(self, args):
         testSeries = series.Series(self.kwargs['data'], self.kwargs['type'], self.kwargs['strictType'])
         return str({'base series': str(testSeries),
-                    'base series + arg': str(testSeries + args[0])})
\ No newline at end of file
+                    'base series + arg': str(testSeries + args[0])})
+
+    #Apply random changes to a series and to a list side by side, and check that they always hold the same items
+    #Copies taken before each change must be left as they were, which checks that shared nodes are never changed in place
+    #Items can be popped and deleted until the series is empty, so changes are also made to empty series
+    def _series_operations_test(self, args):
+        seriesClass = getattr(series, self.kwargs['seriesType'])
+        rng = random.Random(self.kwargs.get('seed', 0))
+        steps = self.kwargs.get('steps', 500)
+
+        expected = [rng.randint(0, 9) for i in range(rng.randint(1, 20))]
+        testSeries = seriesClass(list(expected))
+        failures = []
+        for step in range(steps):
+            copy = testSeries.copy()
+            copyItems = list(expected)
+            length = len(expected)
+            start, stop = sorted(rng.randint(-length - 2, length + 2) for i in range(2))
+            operation = rng.choice(['append', 'concatenate', 'prepend', 'insert', 'pop', 'set', 'set wrong type', 'get slice', 'set slice', 'delete slice'])
+
+            if operation == 'append':
+                value = rng.randint(0, 9)
+                testSeries += value
+                expected.append(value)
+            elif operation == 'concatenate':
+                values = [rng.randint(0, 9) for i in range(rng.randint(1, 30))]
+                testSeries = testSeries + seriesClass(list(values))
+                expected = expected + values
+            elif operation == 'prepend':
+                values = [rng.randint(0, 9) for i in range(rng.randint(1, 3))]
+                testSeries = (values[0] if len(values) == 1 else values) + testSeries
+                expected = values + expected
+            elif operation == 'insert':
+                value = rng.randint(0, 9)
+                testSeries.insert(start, value)
+                expected.insert(start, value)
+            elif operation == 'pop' and length:
+                index = rng.randrange(-length, length)
+                if testSeries.pop(index) != expected.pop(index):
+                    failures.append((step, operation, 'popped item'))
+            elif operation == 'set' and length:
+                index = rng.randrange(-length, length)
+                testSeries[index] = expected[index] = rng.randint(0, 9)
+            elif operation == 'set wrong type' and length:
+                try:
+                    testSeries[rng.randrange(-length, length)] = str(rng.randint(0, 9))
+                except TypeError:
+                    pass
+                else:
+                    failures.append((step, operation, 'item of another type accepted'))
+            elif operation == 'get slice':
+                stride = rng.choice([None, 1, 2, -1, -2])
+                if list(testSeries[start:stop:stride]) != expected[start:stop:stride]:
+                    failures.append((step, operation, 'slice items'))
+            elif operation == 'set slice':
+                values = [rng.randint(0, 9) for i in range(rng.randint(0, 5))]
+                testSeries[start:stop] = values
+                expected[start:stop] = values
+            elif operation == 'delete slice':
+                del testSeries[start:stop]
+                del expected[start:stop]
+
+            if list(testSeries) != expected or len(testSeries) != len(expected):
+                failures.append((step, operation, 'items'))
+            elif expected and (testSeries[-1] != expected[-1] or list(reversed(testSeries)) != expected[::-1]):
+                failures.append((step, operation, 'last item'))
+            if list(copy) != copyItems:
+                failures.append((step, operation, 'copy changed'))
+
+            if failures:
+                break
+
+        return str({'seriesType': self.kwargs['seriesType'], 'steps': steps, 'failures': failures})
+
+    #Save a series to a file and load it again, giving the error if loading is refused
+    #With truncate, that many bytes are cut from the end of the file before it is loaded
+    def _series_file_test(self, args):
+        testSeries = getattr(series, self.kwargs.get('seriesType', 'Series'))(self.kwargs['data'], self.kwargs['type'], self.kwargs.get('subType'))
+
+        directory = tempfile.mkdtemp()
+        path = os.path.join(directory, 'series.kls')
+        try:
+            series.save_series(testSeries, path)
+            if self.kwargs.get('truncate'):
+                os.truncate(path, os.path.getsize(path) - self.kwargs['truncate'])
+
+            try:
+                loaded = series.load_series(path, self.kwargs.get('allowPickle', False))
+            except ValueError as error:
+                return str({'error': str(error)})
+
+            output = {
+                'loaded': repr(loaded),
+                'same items': [repr(item) for item in loaded] == [repr(item) for item in testSeries],
+                'same types': (loaded.type, loaded.subType) == (testSeries.type, testSeries.subType)
+            }
+            del loaded
+        finally:
+            os.remove(path)
+            os.rmdir(directory)
+
+        return str(output)
+
+    #Apply an operation to a fraction array and to each of its items as a Fraction, and check that the results match
+    def _fraction_array_test(self, args):
+        operation = {'+': operator.add, '-': operator.sub, '*': operator.mul, '/': operator.truediv}[self.kwargs['opType']]
+        testArray = fractionarray.FractionArray(self.kwargs['values'])
+        other = self.kwargs['other']
+
+        result = operation(testArray, other)
+        otherFraction = fraction.Fraction(list(other)) if type(other) is tuple else other
+        expected = [str(operation(item, otherFraction)) for item in testArray.to_fractions()]
+        return str({'result': str(result), 'matches': result.to_strings() == expected})
+
+    #Build a fraction array from NumPy arrays of numerators and denominators, giving the error if they are refused
+    def _fraction_array_nums_test(self, args):
+        np = fractionarray.np
+        if np is None:
+            return str({'skipped': 'NumPy is not installed'})
+
+        num = np.array(self.kwargs['num'], dtype=self.kwargs['dtype'])
+        dem = np.array(self.kwargs['dem'], dtype=self.kwargs['dtype'])
+        try:
+            testArray = fractionarray.FractionArray.from_nums(num, dem)
+        except TypeError as error:
+            return str({'error': str(error)})
+
+        return str({'array': str(testArray), 'negated': str(-testArray)})
+
+#Tests of the series classes, which pass if every result has no failures and the same items and types
+#Files with pickled items must be refused without allowPickle, and truncated files must always be refused
+SERIES_TESTS = [
+    Test('seriesoperations', seriesType='Series', seed=1),
+    Test('seriesoperations', seriesType='CompactSeries', seed=2),
+    Test('seriesoperations', seriesType='PersistentSeries', seed=3),
+    Test('seriesfile', data=[1, -2, 3], type=int),
+    Test('seriesfile', data=[2 ** 70, -5], type=int),
+    Test('seriesfile', data=[1.5, -0.25], type=float, seriesType='CompactSeries'),
+    Test('seriesfile', data=['a', 'b\u00e9'], type=str),
+    Test('seriesfile', data=[fraction.Fraction('1/3'), fraction.Fraction('-22/7')], type=fraction.Fraction),
+    Test('seriesfile', data=[series.Series([1, 2]), series.Series([3])], type=series.Series, subType=int),
+    Test('seriesfile', data=[(1, 2), (3,)], type=tuple, seriesType='PersistentSeries', allowPickle=True),
+    Test('seriesfile', data=[(1, 2), (3,)], type=tuple),
+    Test('seriesfile', data=[series.Series([1j])], type=series.Series, subType=complex),
+    Test('seriesfile', data=list(range(100)), type=int, truncate=80),
+    Test('seriesfile', data=['a', 'b', 'c'], type=str, truncate=1)
+]
+
+#Tests of Fraction and FrozenFraction against fractions.Fraction, which pass if every result has no failures
+FRACTION_TESTS = [
+    Test('fractionrandom', fractionType='Fraction', seed=1),
+    Test('fractionrandom', fractionType='FrozenFraction', seed=2),
+    Test('fractionrandom', fractionType='Fraction', digits=30, seed=3),
+    Test('fractionrandom', fractionType='FrozenFraction', digits=1, interning=True, seed=4)
+]
+
+#Tests of polynomial multiplication and division, which pass if every result is the same and the remainder is reduced
+#Each product is made by every method, and the divisions cover exact fraction coefficients, several variables and refused exponents
+POLYNOMIAL_TESTS = [
+    Test('polynomialproduct', length=10, seed=1),
+    Test('polynomialproduct', length=100, otherLength=67, seed=2),
+    Test('polynomialproduct', length=80, coefficients='fraction', seed=3),
+    Test('polynomialproduct', length=90, coefficients='float', seed=4),
+    Test('polynomialproduct', length=60, density=0.3, seed=5),
+    Test('polynomialproduct', length=12, variables=['x', 'y'], seed=6),
+    Test('polynomialdivision', length=40, divisorLength=7, seed=7),
+    Test('polynomialdivision', length=30, divisorLength=5, coefficients='fraction', seed=8),
+    Test('polynomialdivision', length=12, divisorLength=4, coefficients='float', seed=9),
+    Test('polynomialdivision', length=8, divisorLength=3, variables=['x', 'y'], coefficients='fraction', seed=10),
+    Test('polynomialdivision', length=5, divisorLength=9, seed=11),
+    Test('polynomialdivision', polynomial='x^3 + x^-1', divisor='x + 1')
+]
+
+#Tests of fraction arrays, which pass if every result matches and arrays that cannot be stored exactly are refused or kept as Python ints
+FRACTION_ARRAY_TESTS = [
+    Test('fractionarray', values=[2 ** 40], other=(1, -2 ** 40), opType='+'),
+    Test('fractionarray', values=[1, -3, 7], other=(4, -6), opType='*'),
+    Test('fractionarray', values=['1/3', '-5/2'], other=fraction.Fraction('3/7'), opType='-'),
+    Test('fractionarray', values=[2 ** 62, 3], other=2 ** 62, opType='/'),
+    Test('fractionarray', values=[1, '1/10', 0.1], other=0.1, opType='+'),
+    Test('fractionarraynums', num=[0.5, 1.5], dem=[1, 1], dtype='float64'),
+    Test('fractionarraynums', num=[2 ** 64 - 1], dem=[1], dtype='uint64'),
+    Test('fractionarraynums', num=[-2 ** 63], dem=[1], dtype='int64')
+]
+
+if __name__ == '__main__':
+    for test in FRACTION_TESTS + SERIES_TESTS + POLYNOMIAL_TESTS + FRACTION_ARRAY_TESTS:
+        print(f'{test}: {test.test()}')